@@ -0,0 +1,158 @@
+import sys
+import time
+import tracemalloc
+
+import degrees
+from graph import Graph
+
+from util import Node, StackFrontier, QueueFrontier
+
+
+class ListStackFrontier():
+    """
+    The original list-backed frontier, kept for comparison.
+    """
+    def __init__(self):
+        self.frontier = []
+
+    def add(self, node):
+        self.frontier.append(node)
+
+    def contains_state(self, state):
+        return any(node.state == state for node in self.frontier)
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier[-1]
+            self.frontier = self.frontier[:-1]
+            return node
+
+
+class ListQueueFrontier(ListStackFrontier):
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier[0]
+            self.frontier = self.frontier[1:]
+            return node
+
+
+def time_frontier(frontier_class, n, lookups):
+    """
+    Returns the seconds taken to add `n` nodes, check `lookups`
+    states for membership and remove every node again.
+    """
+    frontier = frontier_class()
+    start = time.perf_counter()
+    for state in range(n):
+        frontier.add(Node(state=state, parent=None, action=None))
+    for state in range(0, 2 * n, max(1, 2 * n // lookups)):
+        frontier.contains_state(state)
+    while not frontier.empty():
+        frontier.remove()
+    return time.perf_counter() - start
+
+
+def frontiers(sizes):
+    """
+    Compares the list-backed frontiers with the deque-backed ones.
+
+    The old frontiers are quadratic, so they are only timed up to
+    10^5 nodes and with a small number of membership checks.
+    """
+    pairs = [
+        ("stack", ListStackFrontier, StackFrontier),
+        ("queue", ListQueueFrontier, QueueFrontier)
+    ]
+    for n in sizes:
+        lookups = 100
+        for kind, old, new in pairs:
+            new_time = time_frontier(new, n, lookups)
+            if n <= 10 ** 5:
+                old_time = time_frontier(old, n, lookups)
+                speedup = f"{old_time / new_time:.0f}x"
+                old_time = f"{old_time:.3f}s"
+            else:
+                old_time, speedup = "skipped", "-"
+            print(f"{kind:5} n={n:<8} old={old_time:>9} new={new_time:.3f}s speedup={speedup}")
+
+
+def measure(load):
+    """
+    Returns the result of `load()`, the bytes it kept allocated
+    and the seconds it took.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = load()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def memory(directory):
+    """
+    Compares memory held by the dict backend of `degrees.load_data`
+    with the CSR backend of `Graph.load`.
+    """
+    _, dict_size, dict_time = measure(lambda: degrees.load_data(directory))
+    graph, csr_size, csr_time = measure(lambda: Graph.load(directory))
+    print(f"people={len(graph.person_ids)} movies={len(graph.movie_ids)} stars={len(graph.person_movies)}")
+    print(f"dicts: {dict_size / 2 ** 20:8.1f} MiB loaded in {dict_time:.2f}s")
+    print(f"csr:   {csr_size / 2 ** 20:8.1f} MiB loaded in {csr_time:.2f}s")
+
+
+def cold_start(directory):
+    """
+    Compares parsing the CSV files with reopening a snapshot.
+    """
+    start = time.perf_counter()
+    degrees.load_data(directory)
+    print(f"load_data:          {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    Graph.load(directory)
+    print(f"Graph.load:         {time.perf_counter() - start:.3f}s")
+
+    Graph.open(directory)
+    start = time.perf_counter()
+    Graph.open(directory)
+    print(f"Graph.open (mmap):  {time.perf_counter() - start:.3f}s")
+
+
+def frontiers_command(*sizes):
+    sizes = [int(size) for size in sizes] or [10 ** 4, 10 ** 5, 10 ** 6]
+    frontiers(sizes)
+
+
+def memory_command(directory="large"):
+    memory(directory)
+
+
+def cold_start_command(directory="large"):
+    cold_start(directory)
+
+
+COMMANDS = {
+    "coldstart": cold_start_command,
+    "frontiers": frontiers_command,
+    "memory": memory_command
+}
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in COMMANDS:
+        sys.exit(f"Usage: python benchmark.py [{'|'.join(COMMANDS)}] [args]")
+    COMMANDS[sys.argv[1]](*sys.argv[2:])
+
+
+if __name__ == "__main__":
+    main()
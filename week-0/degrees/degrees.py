@@ -1,7 +1,15 @@
+import argparse
 import csv
+import errno
+import io
+import json
+import os
 import sys
+import time
 
-from util import Node, StackFrontier, QueueFrontier
+from graph import Graph
+from nameindex import NameIndex
+from util import Node, StackFrontier, QueueFrontier, LRUCache
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,29 +20,100 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Prefix and trigram index over names, for ranked suggestions: built
+# only once a name has no exact match
+name_index = None
+
+# With the "csr" backend: the graph memory-mapped from a snapshot,
+# used instead of names, people and movies
+snapshot_graph = None
+
+# Maps each CSV path read so far to (bytes read, header fieldnames, inode)
+read_positions = {}
+
+# Maps frozenset({source, target}) to (source the path starts at, path)
+path_cache = LRUCache(4096)
+
+# Maps hot sources to (parents, distances) of a full breadth-first search,
+# holding at most TREE_CACHE_PEOPLE people over all trees: each person
+# reached costs a parents and a distances entry, about 200 bytes
+TREE_CACHE_PEOPLE = 500_000
+tree_cache = LRUCache(TREE_CACHE_PEOPLE, weigh=lambda tree: len(tree[1]))
+
+# Maps recent sources to how often they were queried
+source_counts = LRUCache(4096)
+
+# Queries from one source before its whole search tree is cached;
+# a full tree costs about as much as this many bidirectional searches
+HOT_SOURCE_QUERIES = 8
+
 
 def load_data(directory):
     """
     Load data from CSV files into memory.
+
+    Remembers how far each file was read, so rows appended later
+    can be applied with `ingest_data` without reloading.
+    """
+    ingest_data(directory)
+
+
+def load_graph(directory, snapshot=None):
+    """
+    Opens the compact graph of `directory` through `Graph.open`,
+    memory-mapping its snapshot instead of parsing the CSV files when
+    the snapshot is still current.
     """
+    global snapshot_graph
+    snapshot_graph = Graph.open(directory, snapshot)
+
+
+def ingest_data(directory):
+    """
+    Applies rows of people.csv, movies.csv and stars.csv in `directory`
+    that have not been read yet: rows appended to files loaded before,
+    or every row of delta files seen for the first time.
+
+    Files missing from `directory` are skipped, so a delta directory
+    may hold only some of them, but a missing directory raises
+    FileNotFoundError. Drops cached answers that new star pairs could
+    change, and returns the new (movie_id, person_id) pairs.
+    """
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(errno.ENOENT, "No such directory", directory)
+    added_names = {}
+
     # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
+    for row in read_new_rows(f"{directory}/people.csv"):
+        person_id, name = row["id"], row["name"]
+        if person_id in people:
+            # A corrected row replaces the old name and birth
+            person = people[person_id]
+            old = person["name"].lower()
+            names[old].discard(person_id)
+            if not names[old]:
+                del names[old]
+            if name_index is not None:
+                name_index.discard(old, person_id)
+            person["name"], person["birth"] = name, row["birth"]
+        else:
+            people[person_id] = {
+                "name": name,
                 "birth": row["birth"],
                 "movies": set()
             }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
+        if name.lower() not in names:
+            names[name.lower()] = {person_id}
+        else:
+            names[name.lower()].add(person_id)
+        added_names.setdefault(name.lower(), set()).add(person_id)
 
     # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
+    for row in read_new_rows(f"{directory}/movies.csv"):
+        if row["id"] in movies:
+            movies[row["id"]]["title"] = row["title"]
+            movies[row["id"]]["year"] = row["year"]
+        else:
             movies[row["id"]] = {
                 "title": row["title"],
                 "year": row["year"],
@@ -42,25 +121,96 @@ def load_data(directory):
             }
 
     # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+    added_stars = []
+    for row in read_new_rows(f"{directory}/stars.csv"):
+        try:
+            person_movies = people[row["person_id"]]["movies"]
+            stars = movies[row["movie_id"]]["stars"]
+        except KeyError:
+            continue
+        if row["movie_id"] not in person_movies:
+            person_movies.add(row["movie_id"])
+            stars.add(row["person_id"])
+            added_stars.append((row["movie_id"], row["person_id"]))
+
+    # Index names once every person is known
+    if name_index is not None:
+        name_index.update(added_names)
+
+    if added_stars:
+        invalidate_caches(added_stars)
+    return added_stars
+
+
+def read_new_rows(path):
+    """
+    Returns the rows of a CSV file past the point it was last read
+    to, as dictionaries, and remembers the new position.
+
+    A trailing line without a newline is left for the next read,
+    since its writer may not have finished it. A missing file has no
+    rows. A file that shrank or was replaced since the last read is
+    read again from the start.
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        offset, fieldnames, inode = read_positions.get(path, (0, None, stat.st_ino))
+        if stat.st_size < offset or stat.st_ino != inode:
+            offset, fieldnames = 0, None
+        f.seek(offset)
+        data = f.read()
+    data = data[:data.rfind(b"\n") + 1]
+    if not data:
+        return []
+
+    lines = io.StringIO(data.decode("utf-8"), newline="")
+    reader = csv.DictReader(lines, fieldnames=fieldnames)
+    rows = list(reader)
+    read_positions[path] = (offset + len(data), reader.fieldnames, stat.st_ino)
+    return rows
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(description="Degrees of separation between actors.")
+    parser.add_argument("directory", nargs="?", default="large")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--batch", metavar="FILE",
+                      help="answer tab-separated name pairs from FILE ('-' for stdin)")
+    mode.add_argument("--serve", action="store_true",
+                      help="answer JSON-lines queries on stdin until it closes")
+    parser.add_argument("--backend", choices=("dicts", "csr"), default="dicts",
+                        help="'csr' loads the compact graph from a snapshot, "
+                             "writing it first if it is missing or stale")
+    parser.add_argument("--snapshot", metavar="FILE",
+                        help="snapshot path for the csr backend "
+                             "(default: graph.snapshot in the directory)")
+    args = parser.parse_args()
+    if args.snapshot and args.backend != "csr":
+        parser.error("--snapshot needs --backend csr")
+
+    # Keep stdout clean for machine-readable output
+    log = sys.stderr if args.batch or args.serve else sys.stdout
 
     # Load data from files into memory
-    print("Loading data...")
-    load_data(directory)
-    print("Data loaded.")
+    print("Loading data...", file=log)
+    if args.backend == "csr":
+        load_graph(args.directory, args.snapshot)
+    else:
+        load_data(args.directory)
+    print("Data loaded.", file=log)
+
+    if args.batch:
+        if args.batch == "-":
+            run_batch(sys.stdin, sys.stdout)
+        else:
+            with open(args.batch, encoding="utf-8") as f:
+                run_batch(f, sys.stdout)
+        return
+    if args.serve:
+        serve(sys.stdin, sys.stdout)
+        return
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -69,7 +219,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = shortest_path(source, target, bidirectional=True)
 
     if path is None:
         print("Not connected.")
@@ -78,21 +228,125 @@ def main():
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            person1 = person_name(path[i][1])
+            person2 = person_name(path[i + 1][1])
+            movie = movie_title(path[i + 1][0])
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def answer(source_name, target_name):
+    """
+    Answers one query between two names without prompting,
+    preferring the most-credited person for ambiguous names.
+
+    Returns a dictionary with the degrees of separation and the path,
+    or with an "error" describing why there is no answer.
+    """
+    result = {"source": source_name, "target": target_name}
+    source = person_id_for_name(source_name, interactive=False, policy=most_credited)
+    target = person_id_for_name(target_name, interactive=False, policy=most_credited)
+    if source is None or target is None:
+        missing = source_name if source is None else target_name
+        result["error"] = f"Person not found: {missing}"
+        result["suggestions"] = suggest_names(missing)
+        return result
+
+    path = cached_shortest_path(source, target)
+    if path is None:
+        result["error"] = "Not connected."
+        return result
+
+    result["degrees"] = len(path)
+    result["path"] = [
+        {
+            "movie_id": movie_id,
+            "movie": movie_title(movie_id),
+            "person_id": person_id,
+            "person": person_name(person_id)
+        }
+        for movie_id, person_id in path
+    ]
+    return result
+
+
+def run_batch(lines, out):
+    """
+    Answers one query per tab-separated "source<TAB>target" line,
+    streaming a JSON result per line to `out`.
+    """
+    queries = 0
+    start = time.perf_counter()
+    for row in csv.reader(lines, delimiter="\t"):
+        if len(row) != 2:
+            continue
+        out.write(json.dumps(answer(row[0], row[1])) + "\n")
+        queries += 1
+    report(queries, time.perf_counter() - start)
+
+
+def serve(requests, out):
+    """
+    Answers JSON-lines queries of the form {"source": ..., "target": ...}
+    until `requests` closes, keeping the loaded data resident.
+
+    A request of the form {"ingest": directory} applies new CSV rows
+    from `directory` with `ingest_data` instead.
+    """
+    queries = 0
+    elapsed = 0
+    for line in requests:
+        if not line.strip():
+            continue
+        start = time.perf_counter()
+        try:
+            query = json.loads(line)
+            if "ingest" in query and snapshot_graph is not None:
+                result = {"error": "The csr backend cannot ingest new rows."}
+            elif "ingest" in query:
+                added = ingest_data(query["ingest"])
+                result = {"ingested_stars": len(added)}
+            elif isinstance(query["source"], str) and isinstance(query["target"], str):
+                result = answer(query["source"], query["target"])
+            else:
+                raise TypeError("source and target must be strings")
+        except (ValueError, KeyError, TypeError):
+            result = {"error": "Expected a JSON object with source and target."}
+        except OSError as e:
+            result = {"error": str(e)}
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+        elapsed += time.perf_counter() - start
+        queries += 1
+    report(queries, elapsed)
+
+
+def report(queries, elapsed):
+    """
+    Prints query throughput and cache counters to stderr.
+    """
+    rate = queries / elapsed if elapsed else 0
+    print(f"{queries} queries in {elapsed:.3f}s ({rate:.1f} queries/sec).", file=sys.stderr)
+    print(f"Path cache: {path_cache.stats()}", file=sys.stderr)
+    print(f"Tree cache: {tree_cache.stats()}", file=sys.stderr)
+    print(f"Source counts: {source_counts.stats()}", file=sys.stderr)
+
+
+def shortest_path(source, target, bidirectional=False):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
+
+    With `bidirectional` set, the search grows frontiers from both
+    ends and meets in the middle instead. The csr backend always
+    searches that way.
     """
+    if snapshot_graph is not None:
+        return snapshot_graph.shortest_path(source, target)
+    if bidirectional:
+        return bidirectional_path(source, target)
 
-    # TODO
     start = Node(state=source, parent=None, action=None)
     frontier = QueueFrontier()
     frontier.add(start)
@@ -115,6 +369,201 @@ def shortest_path(source, target):
                     return build_path(child)
                 frontier.add(child)
 
+
+def bidirectional_path(source, target):
+    """
+    Breadth-first search from both the source and the target at once.
+
+    Each round expands one whole layer of the smaller frontier. Once
+    a layer touches people already reached from the other side, the
+    cheapest meeting point of that layer gives a shortest path.
+    Returns the same (movie_id, person_id) list as `shortest_path`.
+    """
+    if source == target:
+        return []
+
+    # Maps person_id to (movie_id, neighbouring person_id) towards each end
+    forward = {source: None}
+    backward = {target: None}
+    depth_forward = {source: 0}
+    depth_backward = {target: 0}
+    frontier_forward = [source]
+    frontier_backward = [target]
+
+    while frontier_forward and frontier_backward:
+        if len(frontier_forward) <= len(frontier_backward):
+            frontier, parents, depths = frontier_forward, forward, depth_forward
+            other, other_depths = backward, depth_backward
+        else:
+            frontier, parents, depths = frontier_backward, backward, depth_backward
+            other, other_depths = forward, depth_forward
+
+        best = None
+        next_frontier = []
+        for person_id in frontier:
+            depth = depths[person_id] + 1
+            for movie_id, neighbor_id in neighbors_for_person(person_id):
+                if neighbor_id in parents:
+                    continue
+                parents[neighbor_id] = (movie_id, person_id)
+                depths[neighbor_id] = depth
+                next_frontier.append(neighbor_id)
+                if neighbor_id in other:
+                    length = depth + other_depths[neighbor_id]
+                    if best is None or length < best[0]:
+                        best = (length, neighbor_id)
+
+        if best is not None:
+            return join_paths(forward, backward, best[1])
+
+        if frontier is frontier_forward:
+            frontier_forward = next_frontier
+        else:
+            frontier_backward = next_frontier
+
+    return None
+
+
+def cached_shortest_path(source, target):
+    """
+    Returns the same path as `shortest_path`, answering from caches
+    where possible.
+
+    Paths are cached per unordered pair, since the path from target to
+    source is the reversed path. Sources queried often have their
+    whole search tree cached, answering any later query from them
+    (or to them) by walking the tree's parents.
+    """
+    key = frozenset((source, target))
+    cached = path_cache.get(key)
+    if cached is not None:
+        start, path = cached
+        return path if start == source else reverse_path(start, path)
+
+    path = path_from_trees(source, target)
+    if path is False:
+        count = source_counts.get(source, 0) + 1
+        source_counts.put(source, count)
+        # Search trees are built over the dictionaries only
+        if count >= HOT_SOURCE_QUERIES and snapshot_graph is None:
+            tree = search_tree(source)
+            tree_cache.put(source, tree)
+            path = path_from_tree(tree, target)
+        else:
+            path = shortest_path(source, target, bidirectional=True)
+
+    path_cache.put(key, (source, path))
+    return path
+
+
+def path_from_trees(source, target):
+    """
+    Returns the path between source and target from a cached search
+    tree of either one, or False if neither has a cached tree.
+    """
+    # Checked first, so that only one lookup counts as a miss
+    if source in tree_cache or target not in tree_cache:
+        tree = tree_cache.get(source)
+        return False if tree is None else path_from_tree(tree, target)
+    return reverse_path(target, path_from_tree(tree_cache.get(target), source))
+
+
+def search_tree(source):
+    """
+    Runs a breadth-first search from `source` over everyone reachable.
+
+    Returns (parents, distances): parents maps each reached person_id
+    to the (movie_id, person_id) it was reached from, and distances
+    maps it to its degrees of separation from the source.
+    """
+    parents = {source: None}
+    distances = {source: 0}
+    # Each movie's cast only needs to be scanned once
+    seen_movies = set()
+    frontier = [source]
+    depth = 0
+    while frontier:
+        depth += 1
+        next_frontier = []
+        for person_id in frontier:
+            for movie_id in people[person_id]["movies"] - seen_movies:
+                seen_movies.add(movie_id)
+                for neighbor_id in movies[movie_id]["stars"]:
+                    if neighbor_id not in parents:
+                        parents[neighbor_id] = (movie_id, person_id)
+                        distances[neighbor_id] = depth
+                        next_frontier.append(neighbor_id)
+        frontier = next_frontier
+    return parents, distances
+
+
+def path_from_tree(tree, target):
+    """
+    Returns the path from the root of a `search_tree` to `target`,
+    or None if the target was not reached.
+    """
+    parents, _ = tree
+    if target not in parents:
+        return None
+    path = []
+    while parents[target] is not None:
+        movie_id, parent_id = parents[target]
+        path.append((movie_id, target))
+        target = parent_id
+    path.reverse()
+    return path
+
+
+def reverse_path(source, path):
+    """
+    Reverses a path that starts at `source`, so it leads back to it.
+    """
+    if path is None:
+        return None
+    people_on_path = [source] + [person_id for _, person_id in path]
+    return [(path[i][0], people_on_path[i]) for i in reversed(range(len(path)))]
+
+
+def invalidate_caches(added_stars):
+    """
+    Drops cached answers that new (movie_id, person_id) star pairs
+    could change.
+
+    Any cached path may now have a shorter alternative, so the path
+    cache is cleared. A cached search tree stays valid as long as each
+    affected movie's cast was either not reached at all, or reached
+    within one degree of each other.
+    """
+    path_cache.clear()
+    touched = {movie_id for movie_id, _ in added_stars}
+    for source, (_, distances) in list(tree_cache.entries.items()):
+        for movie_id in touched:
+            depths = [distances.get(person_id) for person_id in movies[movie_id]["stars"]]
+            reached = [depth for depth in depths if depth is not None]
+            if reached and (len(reached) < len(depths) or max(reached) - min(reached) > 1):
+                tree_cache.discard(source)
+                break
+
+
+def join_paths(forward, backward, meeting):
+    """
+    Joins the two half-searches of `bidirectional_path` at `meeting`.
+    """
+    path = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, parent_id = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent_id
+    path.reverse()
+
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, person_id = backward[person_id]
+        path.append((movie_id, person_id))
+    return path
+
+
 def build_path(node):
     """
     Constructs the path from the starting node to the current node.
@@ -127,20 +576,29 @@ def build_path(node):
     return path
 
 
-def person_id_for_name(name):
+def person_id_for_name(name, interactive=True, policy=None):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    Without `interactive`, nothing is prompted: ambiguous names are
+    resolved by `policy`, a function choosing one of the candidate
+    person_ids, or return None if no policy is given.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = person_ids_for_name(name)
     if len(person_ids) == 0:
+        if interactive:
+            suggestions = suggest_names(name)
+            if suggestions:
+                print(f"Did you mean: {', '.join(suggestions)}?")
         return None
     elif len(person_ids) > 1:
+        if not interactive:
+            return policy(person_ids) if policy else None
         print(f"Which '{name}'?")
         for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
+            name = person_name(person_id)
+            birth = person_birth(person_id)
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
         try:
             person_id = input("Intended Person ID: ")
@@ -153,6 +611,73 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def person_ids_for_name(name):
+    """
+    Returns the person_ids whose name matches `name`, ignoring case.
+    """
+    if snapshot_graph is not None:
+        return list(snapshot_graph.person_ids_for_name(name))
+    return list(names.get(name.lower(), set()))
+
+
+def person_name(person_id):
+    if snapshot_graph is not None:
+        return snapshot_graph.person_names[snapshot_graph.person_index[person_id]]
+    return people[person_id]["name"]
+
+
+def person_birth(person_id):
+    if snapshot_graph is not None:
+        return snapshot_graph.births[snapshot_graph.person_index[person_id]]
+    return people[person_id]["birth"]
+
+
+def movie_title(movie_id):
+    if snapshot_graph is not None:
+        return snapshot_graph.titles[snapshot_graph.movie_index[movie_id]]
+    return movies[movie_id]["title"]
+
+
+def credits(person_id):
+    """
+    Returns the number of movies a person starred in.
+    """
+    if snapshot_graph is not None:
+        return len(snapshot_graph.movies_for(snapshot_graph.person_index[person_id]))
+    return len(people[person_id]["movies"])
+
+
+def most_credited(person_ids):
+    """
+    Disambiguation policy preferring the person with the most movies.
+    """
+    return max(person_ids, key=credits)
+
+
+def suggest_names(name, limit=5):
+    """
+    Returns up to `limit` distinct names similar to `name`,
+    best match first.
+    """
+    global name_index
+    if name_index is None:
+        name_index = NameIndex()
+        if snapshot_graph is None:
+            name_index.update(names)
+        else:
+            grouped = {}
+            for person_id, person in zip(snapshot_graph.person_ids, snapshot_graph.person_names):
+                grouped.setdefault(person.lower(), set()).add(person_id)
+            name_index.update(grouped)
+
+    suggestions = []
+    for person_id in name_index.candidates(name, limit * 2, weight=credits):
+        suggestion = person_name(person_id)
+        if suggestion not in suggestions:
+            suggestions.append(suggestion)
+    return suggestions[:limit]
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
@@ -0,0 +1,450 @@
+import csv
+import json
+import mmap
+import multiprocessing
+import os
+import struct
+import sys
+from array import array
+
+# Snapshot files start with this magic and format version
+SNAPSHOT_MAGIC = b"DEGRAPH\0"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_NAME = "graph.snapshot"
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+# Order of the integer buffers and string tables inside a snapshot
+BUFFERS = ("person_offsets", "person_movies", "movie_offsets", "movie_people")
+TABLES = ("person_ids", "person_names", "births", "movie_ids", "titles", "years")
+
+
+class Graph():
+    """
+    Compact person <-> movie graph for the degrees dataset.
+
+    People and movies are interned to dense integer indices. The
+    bipartite adjacency is stored in CSR form: the movies of person
+    `i` are `person_movies[person_offsets[i]:person_offsets[i + 1]]`
+    and the stars of movie `j` are found the same way through
+    `movie_offsets` and `movie_people`.
+    """
+
+    def __init__(self, person_ids, person_names, births,
+                 movie_ids, titles, years,
+                 person_offsets, person_movies,
+                 movie_offsets, movie_people):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.births = births
+        self.movie_ids = movie_ids
+        self.titles = titles
+        self.years = years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+        # Graphs opened without their string tables have no id indexes
+        if person_ids is None:
+            self.person_index = self.movie_index = None
+        else:
+            self.person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+            self.movie_index = {movie_id: j for j, movie_id in enumerate(movie_ids)}
+        self.name_index = None
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Builds a graph from the CSV files in `directory`.
+        """
+        person_ids, person_names, births = [], [], []
+        person_index = {}
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                person_index[row["id"]] = len(person_ids)
+                person_ids.append(row["id"])
+                person_names.append(row["name"])
+                births.append(row["birth"])
+
+        movie_ids, titles, years = [], [], []
+        movie_index = {}
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                movie_index[row["id"]] = len(movie_ids)
+                movie_ids.append(row["id"])
+                titles.append(row["title"])
+                years.append(row["year"])
+
+        # Collect edges as two parallel index buffers
+        edge_people, edge_movies = array("i"), array("i")
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                i = person_index.get(row["person_id"])
+                j = movie_index.get(row["movie_id"])
+                if i is not None and j is not None:
+                    edge_people.append(i)
+                    edge_movies.append(j)
+
+        person_offsets, person_movies = csr(len(person_ids), edge_people, edge_movies)
+        movie_offsets, movie_people = csr(len(movie_ids), edge_movies, edge_people)
+        return cls(person_ids, person_names, births,
+                   movie_ids, titles, years,
+                   person_offsets, person_movies,
+                   movie_offsets, movie_people)
+
+    @classmethod
+    def open(cls, directory, snapshot=None):
+        """
+        Returns the graph for `directory`, memory-mapping its snapshot
+        if one exists and still matches the CSV files. Otherwise the
+        CSV files are parsed and a fresh snapshot is written.
+        """
+        snapshot = snapshot or os.path.join(directory, SNAPSHOT_NAME)
+        sources = source_stats(directory)
+        try:
+            return cls.from_snapshot(snapshot, sources)
+        except (OSError, ValueError):
+            pass
+        graph = cls.load(directory)
+        graph.save(snapshot, sources)
+        return graph
+
+    @classmethod
+    def from_snapshot(cls, path, sources=None, tables=True):
+        """
+        Memory-maps a snapshot written by `save`. The integer buffers
+        are used in place; only the string tables are decoded. Without
+        `tables`, they are left out and the graph can only be searched
+        by person index.
+
+        Raises ValueError if the file is not a snapshot of this
+        version, or if `sources` is given and differs from the CSV
+        stats recorded in it.
+        """
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(data)
+        prefix = struct.calcsize("<8sII")
+        if len(data) < prefix:
+            raise ValueError("truncated snapshot")
+        magic, version, header_size = struct.unpack_from("<8sII", data)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError("not a snapshot of this version")
+        header = json.loads(bytes(view[prefix:prefix + header_size]))
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError("snapshot written on a different byte order")
+        if sources is not None and header["sources"] != sources:
+            raise ValueError("snapshot is stale")
+
+        fields = {}
+        for name, (start, end, count) in header["sections"].items():
+            section = view[start:end]
+            if name in BUFFERS:
+                fields[name] = section.cast("i")
+            elif not tables:
+                fields[name] = None
+            elif count:
+                fields[name] = bytes(section).decode("utf-8").split("\0")
+            else:
+                fields[name] = []
+        graph = cls(**fields)
+        graph.snapshot = data
+        return graph
+
+    def save(self, path, sources):
+        """
+        Writes the graph to a snapshot file at `path`, recording the
+        CSV `sources` stats it was built from.
+        """
+        sections = []
+        for name in BUFFERS:
+            buffer = getattr(self, name)
+            sections.append((name, bytes(buffer), len(buffer)))
+        for name in TABLES:
+            table = getattr(self, name)
+            sections.append((name, "\0".join(table).encode("utf-8"), len(table)))
+
+        # Offsets are relative to the file start, so lay the header out first
+        prefix = struct.calcsize("<8sII")
+        header = {"byteorder": sys.byteorder, "sources": sources, "sections": {}}
+        header_size = len(json.dumps(header).encode("utf-8")) + 64 * len(sections)
+        offset = align(prefix + header_size)
+        for name, blob, count in sections:
+            header["sections"][name] = [offset, offset + len(blob), count]
+            offset = align(offset + len(blob))
+        encoded = json.dumps(header).encode("utf-8").ljust(header_size)
+
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(struct.pack("<8sII", SNAPSHOT_MAGIC, SNAPSHOT_VERSION, header_size))
+            f.write(encoded)
+            for name, blob, _ in sections:
+                f.seek(header["sections"][name][0])
+                f.write(blob)
+        os.replace(temporary, path)
+
+    def movies_for(self, i):
+        """
+        Returns the movie indices person `i` starred in.
+        """
+        return self.person_movies[self.person_offsets[i]:self.person_offsets[i + 1]]
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target, like
+        `degrees.shortest_path`.
+
+        If no possible path, returns None.
+
+        Searches from both ends at once, expanding one whole layer
+        of the smaller frontier per round, directly over the CSR
+        arrays.
+        """
+        start = self.person_index[source]
+        goal = self.person_index[target]
+        if start == goal:
+            return []
+
+        people, movies = len(self.person_ids), len(self.movie_ids)
+        forward = Search(start, people, movies)
+        backward = Search(goal, people, movies)
+
+        while forward.frontier and backward.frontier:
+            if len(forward.frontier) <= len(backward.frontier):
+                search, other = forward, backward
+            else:
+                search, other = backward, forward
+            meeting = self.expand(search, other)
+            if meeting != -1:
+                return self.build_path(forward, backward, meeting)
+        return None
+
+    def expand(self, search, other):
+        """
+        Expands the frontier of `search` by one layer. Returns the
+        person where it meets `other` on the shortest total path,
+        or -1 if the searches have not met.
+        """
+        person_offsets, person_movies = self.person_offsets, self.person_movies
+        movie_offsets, movie_people = self.movie_offsets, self.movie_people
+        parent_person, parent_movie = search.parent_person, search.parent_movie
+        seen_movies = search.seen_movies
+        other_depth = other.depth
+
+        best, meeting = -1, -1
+        frontier = []
+        for i in search.frontier:
+            for m in range(person_offsets[i], person_offsets[i + 1]):
+                j = person_movies[m]
+                if seen_movies[j]:
+                    continue
+                seen_movies[j] = 1
+                for p in range(movie_offsets[j], movie_offsets[j + 1]):
+                    k = movie_people[p]
+                    if parent_person[k] != -1:
+                        continue
+                    parent_person[k] = i
+                    parent_movie[k] = j
+                    frontier.append(k)
+                    if other_depth[k] != -1 and (best == -1 or other_depth[k] < best):
+                        best, meeting = other_depth[k], k
+
+        search.layer += 1
+        for k in frontier:
+            search.depth[k] = search.layer
+        search.frontier = frontier
+        return meeting
+
+    def distances(self, start):
+        """
+        Returns an array with the degrees of separation between person
+        `start` and every person, in one breadth-first pass.
+        Unreachable people have distance -1.
+        """
+        person_offsets, person_movies = self.person_offsets, self.person_movies
+        movie_offsets, movie_people = self.movie_offsets, self.movie_people
+        distance = array("i", [-1]) * (len(person_offsets) - 1)
+        seen_movies = bytearray(len(movie_offsets) - 1)
+
+        distance[start] = 0
+        layer = 0
+        frontier = [start]
+        while frontier:
+            layer += 1
+            next_frontier = []
+            for i in frontier:
+                for m in range(person_offsets[i], person_offsets[i + 1]):
+                    j = person_movies[m]
+                    if seen_movies[j]:
+                        continue
+                    seen_movies[j] = 1
+                    for p in range(movie_offsets[j], movie_offsets[j + 1]):
+                        k = movie_people[p]
+                        if distance[k] == -1:
+                            distance[k] = layer
+                            next_frontier.append(k)
+            frontier = next_frontier
+        return distance
+
+    def histogram(self, i):
+        """
+        Returns a dictionary mapping each degree of separation to the
+        number of people that far from person `i`. People who cannot be
+        reached are not counted.
+        """
+        counts = {}
+        for d in self.distances(i):
+            if d != -1:
+                counts[d] = counts.get(d, 0) + 1
+        return dict(sorted(counts.items()))
+
+    def person_ids_for_name(self, name):
+        """
+        Returns the person ids whose name matches `name`, ignoring case.
+        """
+        if self.name_index is None:
+            self.name_index = {}
+            for person_id, person_name in zip(self.person_ids, self.person_names):
+                self.name_index.setdefault(person_name.lower(), []).append(person_id)
+        return self.name_index.get(name.lower(), [])
+
+    def build_path(self, forward, backward, meeting):
+        """
+        Joins the two half-searches of `shortest_path` at `meeting`
+        into a list of (movie_id, person_id) pairs.
+        """
+        path = []
+        k = meeting
+        while k != forward.start:
+            path.append((self.movie_ids[forward.parent_movie[k]], self.person_ids[k]))
+            k = forward.parent_person[k]
+        path.reverse()
+
+        k = meeting
+        while k != backward.start:
+            j = backward.parent_movie[k]
+            k = backward.parent_person[k]
+            path.append((self.movie_ids[j], self.person_ids[k]))
+        return path
+
+
+class Search():
+    """
+    State of one direction of a breadth-first search over a Graph.
+    """
+
+    def __init__(self, start, people, movies):
+        self.start = start
+        self.layer = 0
+        self.frontier = [start]
+        # For every reached person, the person and movie it was reached from
+        self.parent_person = array("i", [-1]) * people
+        self.parent_movie = array("i", [-1]) * people
+        self.parent_person[start] = start
+        self.depth = array("i", [-1]) * people
+        self.depth[start] = 0
+        # Each movie's cast only needs to be scanned once
+        self.seen_movies = bytearray(movies)
+
+
+# Graph opened by each histogram worker process
+worker_graph = None
+
+
+def open_worker_graph(snapshot):
+    """
+    Pool initializer: memory-maps the snapshot once per worker, so all
+    workers share the same read-only pages instead of receiving a
+    pickled copy of the graph with every task. Workers only traverse
+    the graph, so its string tables are not decoded.
+    """
+    global worker_graph
+    worker_graph = Graph.from_snapshot(snapshot, tables=False)
+
+
+def worker_histogram(i):
+    return i, worker_graph.histogram(i)
+
+
+def histograms(graph, snapshot, sources, processes=None):
+    """
+    Computes the degree-of-separation histogram of every person id in
+    `sources`, fanning them out over a pool of worker processes that
+    open `snapshot`, the snapshot `graph` was saved to or read from.
+
+    Yields (source, histogram) pairs in completion order.
+    """
+    indices = [graph.person_index[source] for source in sources]
+    with multiprocessing.Pool(processes, open_worker_graph, (snapshot,)) as pool:
+        for i, counts in pool.imap_unordered(worker_histogram, indices):
+            yield graph.person_ids[i], counts
+
+
+def source_stats(directory):
+    """
+    Returns the modification time and size of each CSV file, used to
+    tell whether a snapshot is stale.
+    """
+    stats = {}
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        stats[name] = [stat.st_mtime_ns, stat.st_size]
+    return stats
+
+
+def align(offset):
+    """
+    Rounds `offset` up to a multiple of 8 bytes.
+    """
+    return (offset + 7) & ~7
+
+
+def csr(size, rows, columns):
+    """
+    Groups `columns` by `rows` into (offsets, indices) arrays,
+    where row `r` owns `indices[offsets[r]:offsets[r + 1]]`.
+    """
+    offsets = array("i", [0]) * (size + 1)
+    for r in rows:
+        offsets[r + 1] += 1
+    for r in range(size):
+        offsets[r + 1] += offsets[r]
+
+    indices = array("i", [0]) * len(rows)
+    position = offsets[:-1]
+    for r, c in zip(rows, columns):
+        indices[position[r]] = c
+        position[r] += 1
+    return offsets, indices
+
+
+def main():
+    usage = "Usage: python graph.py build directory | histogram directory name..."
+    if len(sys.argv) < 3 or sys.argv[1] not in ("build", "histogram"):
+        sys.exit(usage)
+    directory = sys.argv[2]
+
+    if sys.argv[1] == "build":
+        path = os.path.join(directory, SNAPSHOT_NAME)
+        Graph.load(directory).save(path, source_stats(directory))
+        print(f"Wrote {path}.")
+        return
+
+    snapshot = os.path.join(directory, SNAPSHOT_NAME)
+    graph = Graph.open(directory, snapshot)
+    sources = []
+    for name in sys.argv[3:]:
+        person_ids = graph.person_ids_for_name(name)
+        if not person_ids:
+            sys.exit(f"Person not found: {name}")
+        sources.extend(person_ids)
+
+    for source, counts in histograms(graph, snapshot, sources):
+        i = graph.person_index[source]
+        print(f"{graph.person_names[i]} ({source}):")
+        for d, count in counts.items():
+            print(f"    {d}: {count}")
+
+
+if __name__ == "__main__":
+    main()
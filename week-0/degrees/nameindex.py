@@ -0,0 +1,150 @@
+from bisect import bisect_left
+from collections import Counter
+from heapq import nlargest, nsmallest
+from itertools import combinations
+
+
+class NameIndex():
+    """
+    Prefix and trigram index over lowercase person names.
+
+    Exact and prefix matches come from a sorted list of names,
+    searched by bisection. Misspelled names are found through a
+    trigram index and ranked by trigram overlap.
+    """
+
+    # Number of rarest query trigrams whose postings are intersected
+    probes = 4
+
+    # Most fuzzy candidates scored against every query trigram
+    max_candidates = 30
+
+    # Largest difference in length between a query and its fuzzy matches
+    max_length_change = 3
+
+    def __init__(self):
+        self.sorted_names = []
+        self.ids = {}
+        self.trigrams = {}
+
+    def discard(self, name, person_id):
+        """
+        Removes `person_id` from under `name`, dropping the name from
+        the index once no person has it.
+        """
+        key = name.lower()
+        person_ids = self.ids.get(key)
+        if person_ids is None:
+            return
+        person_ids.discard(person_id)
+        if person_ids:
+            return
+        del self.ids[key]
+        i = bisect_left(self.sorted_names, key)
+        del self.sorted_names[i]
+        for trigram in trigrams(key):
+            buckets = self.trigrams[trigram]
+            buckets[len(key)].discard(key)
+            if not buckets[len(key)]:
+                del buckets[len(key)]
+            if not buckets:
+                del self.trigrams[trigram]
+
+    def update(self, names):
+        """
+        Adds a dictionary mapping lowercase names to sets of
+        person_ids, sorting once instead of per insert.
+        """
+        for key, person_ids in names.items():
+            if key not in self.ids:
+                self.ids[key] = set()
+                self.sorted_names.append(key)
+                for trigram in trigrams(key):
+                    buckets = self.trigrams.setdefault(trigram, {})
+                    buckets.setdefault(len(key), set()).add(key)
+            self.ids[key].update(person_ids)
+        self.sorted_names.sort()
+
+    def prefix(self, query, limit):
+        """
+        Returns up to `limit` indexed names starting with `query`.
+        """
+        query = query.lower()
+        matches = []
+        i = bisect_left(self.sorted_names, query)
+        while i < len(self.sorted_names) and len(matches) < limit:
+            key = self.sorted_names[i]
+            if not key.startswith(query):
+                break
+            matches.append(key)
+            i += 1
+        return matches
+
+    def fuzzy(self, query, limit):
+        """
+        Returns up to `limit` indexed names most similar to `query`,
+        best first, by the Dice coefficient of their trigram sets.
+
+        Only names within `max_length_change` characters of the query's
+        length are considered, one length bucket at a time. In each
+        bucket the candidates are the names in at least two of the
+        `probes` rarest postings, and the `max_candidates` names with
+        the most hits among those are scored against every posting.
+        """
+        wanted = trigrams(query.lower())
+        length = len(query)
+        found = [self.trigrams[trigram] for trigram in wanted if trigram in self.trigrams]
+
+        # Closest lengths first, so that they win ties in `most_common`
+        sizes = sorted(range(length - self.max_length_change, length + self.max_length_change + 1),
+                       key=lambda size: abs(size - length))
+        hits = Counter()
+        postings = {}
+        for size in sizes:
+            postings[size] = sorted((buckets[size] for buckets in found if size in buckets), key=len)
+            rare = postings[size][:self.probes]
+            if len(rare) == 1:
+                hits.update(rare[0])
+            else:
+                # A name in k of the rare postings is in k(k - 1)/2 of their pairwise intersections
+                for a, b in combinations(rare, 2):
+                    hits.update(a & b)
+
+        scored = []
+        for key, _ in hits.most_common(self.max_candidates):
+            shared = sum(key in posting for posting in postings[len(key)])
+            # A padded name of length n has at most n + 1 trigrams
+            score = 2 * shared / (len(wanted) + len(key) + 1)
+            scored.append((-score, key))
+        return [key for _, key in nsmallest(limit, scored)]
+
+    def candidates(self, query, limit=10, weight=None):
+        """
+        Returns up to `limit` person_ids for `query`, ranked exact
+        matches first, then prefix matches, then fuzzy matches.
+
+        Within an exact or prefix match, ids are ordered by
+        descending `weight(person_id)` if given.
+        """
+        ranked = []
+        seen = set()
+        key = query.lower()
+        groups = ([key], self.prefix(key, limit), lambda: self.fuzzy(key, limit))
+        for group in groups:
+            for name in group() if callable(group) else group:
+                if name in seen or name not in self.ids:
+                    continue
+                seen.add(name)
+                ranked.extend(sorted(self.ids[name], key=weight, reverse=True) if weight else self.ids[name])
+                if len(ranked) >= limit:
+                    return ranked[:limit]
+        return ranked
+
+
+def trigrams(name):
+    """
+    Returns the set of three-character substrings of `name`,
+    padded so that word starts and ends count too.
+    """
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
@@ -1,3 +1,6 @@
+from collections import OrderedDict, deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -7,13 +10,16 @@ class Node():
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        # Number of nodes in the frontier for each state
+        self.states = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
@@ -22,10 +28,17 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.forget(node.state)
             return node
 
+    def forget(self, state):
+        count = self.states[state] - 1
+        if count:
+            self.states[state] = count
+        else:
+            del self.states[state]
+
 
 class QueueFrontier(StackFrontier):
 
@@ -33,6 +46,76 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.forget(node.state)
             return node
+
+
+class LRUCache():
+    """
+    Bounded mapping that evicts the least recently used entries
+    and counts hits, misses and evictions.
+
+    The total weight of the entries is kept within `capacity`, where
+    `weigh(value)` is the weight of an entry, 1 by default. An entry
+    heavier than the whole capacity is not kept at all.
+    """
+
+    def __init__(self, capacity, weigh=None):
+        self.capacity = capacity
+        self.weigh = weigh
+        self.weight = 0
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, default=None):
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.pop(key)
+        self.entries[key] = value
+        self.weight += self.weigh(value) if self.weigh else 1
+        while self.weight > self.capacity:
+            self.pop(next(iter(self.entries)))
+            self.evictions += 1
+
+    def pop(self, key):
+        value = self.entries.pop(key, None)
+        if value is not None:
+            self.weight -= self.weigh(value) if self.weigh else 1
+        return value
+
+    def discard(self, key):
+        if self.pop(key) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        self.invalidations += len(self.entries)
+        self.entries.clear()
+        self.weight = 0
+
+    def stats(self):
+        return {
+            "size": len(self.entries),
+            "weight": self.weight,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
@@ -0,0 +1,207 @@
+import sys
+import time
+
+import bitboard
+import book
+import mnk
+import tictactoe as ttt
+
+
+def first_move():
+    """
+    Times the AI's first move on an empty board: a search with an
+    empty transposition table, then repeated searches with a warm one,
+    then lookups in the opening book.
+    """
+    x, o = bitboard.from_board(ttt.initial_state())
+    bitboard.transpositions.clear()
+    start = time.perf_counter()
+    bitboard.search(x, o)
+    cold = time.perf_counter() - start
+
+    runs = 1000
+    start = time.perf_counter()
+    for _ in range(runs):
+        bitboard.search(x, o)
+    warm = (time.perf_counter() - start) / runs
+
+    book.moves = None
+    start = time.perf_counter()
+    ttt.minimax(ttt.initial_state())
+    first_lookup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        ttt.minimax(ttt.initial_state())
+    lookup = (time.perf_counter() - start) / runs
+
+    print(f"cold search:             {cold * 1e3:10.3f} ms")
+    print(f"warm search:             {warm * 1e6:10.3f} us")
+    print(f"book, including loading: {first_lookup * 1e3:10.3f} ms")
+    print(f"book lookup:             {lookup * 1e6:10.3f} us")
+    print(f"positions in table: {len(bitboard.transpositions)}, in book: {len(book.moves)}")
+
+
+class NoTable(dict):
+    """
+    Transposition table that never stores anything, to measure
+    alpha-beta pruning on its own.
+    """
+    def __setitem__(self, key, value):
+        pass
+
+
+def reachable_positions():
+    """
+    Returns every non-terminal board reachable from the empty board.
+    """
+    positions = {}
+    stack = [ttt.initial_state()]
+    while stack:
+        board = stack.pop()
+        key = bitboard.from_board(board)
+        if key in positions or ttt.terminal(board):
+            continue
+        positions[key] = board
+        for action in ttt.actions(board):
+            stack.append(ttt.result(board, action))
+    return list(positions.values())
+
+
+def tree_size(board, sizes):
+    """
+    Returns the number of nodes plain minimax visits below the board.
+    """
+    key = bitboard.from_board(board)
+    if key not in sizes:
+        sizes[key] = 1
+        if not ttt.terminal(board):
+            sizes[key] += sum(tree_size(ttt.result(board, action), sizes) for action in ttt.actions(board))
+    return sizes[key]
+
+
+def nodes():
+    """
+    Counts the nodes searched from every reachable position by plain
+    minimax, by alpha-beta alone, and by alpha-beta with a warm
+    transposition table, and how many positions the opening book
+    answers without searching.
+    """
+    positions = reachable_positions()
+    sizes = {}
+    plain = sum(tree_size(board, sizes) for board in positions)
+
+    bitboard.killers.clear()
+    bitboard.search_stats["nodes"] = 0
+    for board in positions:
+        bitboard.search(*bitboard.from_board(board), table=NoTable())
+    pruned = bitboard.search_stats["nodes"]
+
+    # Search directly: tictactoe.minimax would answer from the book
+    bitboard.transpositions.clear()
+    bitboard.killers.clear()
+    bitboard.search_stats["nodes"] = 0
+    for board in positions:
+        bitboard.search(*bitboard.from_board(board))
+    cached = bitboard.search_stats["nodes"]
+
+    hits = sum(book.lookup(*bitboard.from_board(board)) is not None for board in positions)
+
+    print(f"positions:               {len(positions)}")
+    print(f"plain minimax:           {plain:>10} nodes")
+    print(f"alpha-beta:              {pruned:>10} nodes ({1 - pruned / plain:.2%} pruned)")
+    print(f"alpha-beta + table:      {cached:>10} nodes ({1 - cached / plain:.2%} pruned)")
+    print(f"opening book:            {hits:>10} hits ({hits / len(positions):.2%} of positions)")
+
+
+def list_minimax(board):
+    """
+    Plain minimax over the list API. Returns (value, nodes visited).
+    """
+    if ttt.terminal(board):
+        return ttt.utility(board), 1
+    values, nodes = [], 1
+    for action in ttt.actions(board):
+        v, n = list_minimax(ttt.result(board, action))
+        values.append(v)
+        nodes += n
+    return (max(values) if ttt.player(board) == ttt.X else min(values)), nodes
+
+
+def bitboard_minimax(x, o):
+    """
+    Plain minimax over bitboards. Returns (value, nodes visited).
+    """
+    wins = bitboard.WINS
+    if wins[x]:
+        return 1, 1
+    if wins[o]:
+        return -1, 1
+    occupied = x | o
+    if occupied == bitboard.FULL:
+        return 0, 1
+    maximizing = x.bit_count() <= o.bit_count()
+    best, nodes = (-2 if maximizing else 2), 1
+    for move in range(9):
+        if occupied >> move & 1:
+            continue
+        if maximizing:
+            v, n = bitboard_minimax(x | 1 << move, o)
+            best = max(best, v)
+        else:
+            v, n = bitboard_minimax(x, o | 1 << move)
+            best = min(best, v)
+        nodes += n
+    return best, nodes
+
+
+def throughput():
+    """
+    Measures nodes per second of a full, unpruned minimax search from
+    the empty board over the list API and over bitboards.
+    """
+    for name, run in (
+        ("list", lambda: list_minimax(ttt.initial_state())),
+        ("bitboard", lambda: bitboard_minimax(0, 0))
+    ):
+        start = time.perf_counter()
+        _, count = run()
+        elapsed = time.perf_counter() - start
+        print(f"{name:9} {count} nodes in {elapsed:.2f}s: {count / elapsed / 1e6:.2f}M nodes/sec")
+
+
+def deadlines(time_limit=0.2):
+    """
+    Plays one self-play game on several m,n,k boards and reports how
+    long each move took against the time budget.
+    """
+    for m, n, k in ((3, 3, 3), (4, 4, 4), (5, 5, 4)):
+        game = mnk.Game(m, n, k)
+        board = game.initial_state()
+        latencies = []
+        while not game.terminal(board):
+            start = time.perf_counter()
+            action = game.minimax(board, time_limit)
+            latencies.append(time.perf_counter() - start)
+            board = game.result(board, action)
+        result = game.winner(board) or "tie"
+        print(f"{m}x{n} k={k}: {len(latencies)} moves, result {result}, "
+              f"budget {time_limit * 1e3:.0f} ms, slowest move {max(latencies) * 1e3:.1f} ms")
+
+
+COMMANDS = {
+    "first-move": first_move,
+    "deadlines": deadlines,
+    "nodes": nodes,
+    "throughput": throughput
+}
+
+
+def main():
+    if len(sys.argv) != 2 or sys.argv[1] not in COMMANDS:
+        sys.exit(f"Usage: python benchmark.py [{'|'.join(COMMANDS)}]")
+    COMMANDS[sys.argv[1]]()
+
+
+if __name__ == "__main__":
+    main()
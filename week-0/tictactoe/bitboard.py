@@ -0,0 +1,194 @@
+"""
+Bitboard Tic Tac Toe engine
+
+A board is a pair of 9-bit integers (x, o), one bit per cell, with
+cell (i, j) stored in bit 3 * i + j. Moves are bit indices.
+"""
+
+import math
+
+X = "X"
+O = "O"
+
+FULL = 0b111111111
+
+# Bit masks of the three rows, three columns and two diagonals
+WIN_MASKS = [
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100
+]
+
+# WINS[bits] is True if the cells in `bits` complete a line
+WINS = [any(bits & mask == mask for mask in WIN_MASKS) for bits in range(FULL + 1)]
+
+# Moves tried first: center, then corners, then edges
+MOVE_ORDER = [4, 0, 2, 6, 8, 1, 3, 5, 7]
+
+# Maps x << 9 | o to (value, bound, optimal move), shared across calls
+# and games; bound says whether the value is exact or only a lower or
+# upper bound left by an alpha-beta cutoff
+transpositions = {}
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Maps the number of moves played to the last move that caused a cutoff
+killers = {}
+
+# Counts positions expanded by `search`
+search_stats = {"nodes": 0}
+
+
+def from_board(board):
+    """
+    Converts a list-of-lists board into an (x, o) bitboard.
+    """
+    x = o = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == X:
+                x |= 1 << (3 * i + j)
+            elif cell == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def to_board(x, o):
+    """
+    Converts an (x, o) bitboard into a list-of-lists board.
+    """
+    return [[X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1 else None
+             for j in range(3)]
+            for i in range(3)]
+
+
+def to_action(move):
+    """
+    Converts a bit index into an (i, j) action.
+    """
+    return divmod(move, 3)
+
+
+def from_action(action):
+    """
+    Converts an (i, j) action into a bit index.
+    """
+    i, j = action
+    return 3 * i + j
+
+
+def player(x, o):
+    """
+    Returns player who has the next turn on a board.
+    """
+    return X if x.bit_count() <= o.bit_count() else O
+
+
+def actions(x, o):
+    """
+    Returns the list of empty cells, in MOVE_ORDER.
+    """
+    occupied = x | o
+    return [move for move in MOVE_ORDER if not occupied >> move & 1]
+
+
+def result(x, o, move):
+    """
+    Returns the board that results from the current player taking `move`.
+    """
+    if (x | o) >> move & 1:
+        raise ValueError("Invalid move: Position already occupied")
+    if x.bit_count() <= o.bit_count():
+        return x | 1 << move, o
+    return x, o | 1 << move
+
+
+def winner(x, o):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    if WINS[x]:
+        return X
+    if WINS[o]:
+        return O
+    return None
+
+
+def terminal(x, o):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return WINS[x] or WINS[o] or x | o == FULL
+
+
+def utility(x, o):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    if WINS[x]:
+        return 1
+    if WINS[o]:
+        return -1
+    return 0
+
+
+def search(x, o, alpha=-math.inf, beta=math.inf, table=None):
+    """
+    Returns (value, optimal move) for the board by minimax with
+    alpha-beta pruning, the move being None on terminal boards.
+
+    Results are memoized in `table`, the shared `transpositions` by
+    default. Values cut off by alpha-beta are stored as bounds and
+    only reused where the bound settles the search.
+    """
+    if table is None:
+        table = transpositions
+    key = x << 9 | o
+    entry = table.get(key)
+    best_move = None
+    if entry is not None:
+        v, bound, best_move = entry
+        if (bound == EXACT
+                or (bound == LOWER and v >= beta)
+                or (bound == UPPER and v <= alpha)):
+            return v, best_move
+
+    search_stats["nodes"] += 1
+    if WINS[x] or WINS[o] or x | o == FULL:
+        v = utility(x, o)
+        table[key] = (v, EXACT, None)
+        return v, None
+
+    # Try the remembered best move, then the killer, then MOVE_ORDER
+    depth = (x | o).bit_count()
+    moves = actions(x, o)
+    for first in (killers.get(depth), best_move):
+        if first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+
+    maximizing = x.bit_count() <= o.bit_count()
+    alpha_start, beta_start = alpha, beta
+    v = -math.inf if maximizing else math.inf
+    for move in moves:
+        if maximizing:
+            child = search(x | 1 << move, o, alpha, beta, table)[0]
+            if child > v:
+                v, best_move = child, move
+                alpha = max(alpha, v)
+        else:
+            child = search(x, o | 1 << move, alpha, beta, table)[0]
+            if child < v:
+                v, best_move = child, move
+                beta = min(beta, v)
+        if alpha >= beta:
+            killers[depth] = move
+            break
+
+    if v <= alpha_start:
+        bound = UPPER
+    elif v >= beta_start:
+        bound = LOWER
+    else:
+        bound = EXACT
+    table[key] = (v, bound, best_move)
+    return v, best_move
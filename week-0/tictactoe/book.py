@@ -0,0 +1,132 @@
+"""
+Precomputed Tic Tac Toe opening book
+
+Every reachable, non-terminal position is reduced to a canonical form
+under the 8 symmetries of the board, solved once, and its optimal
+move stored in book.bin. The book is loaded lazily on first lookup.
+
+Run `python book.py` to regenerate the file.
+"""
+
+import os
+
+import bitboard
+
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+
+# Each entry is 3 bytes: the canonical x << 9 | o key, then 4 bits of move
+ENTRY_SIZE = 3
+
+
+def symmetries():
+    """
+    Returns the 8 rotations and reflections of the board as lists
+    mapping each cell to the cell it moves to.
+    """
+    def rotate(i, j):
+        return j, 2 - i
+
+    def reflect(i, j):
+        return i, 2 - j
+
+    permutations = []
+    for reflected in (False, True):
+        for turns in range(4):
+            permutation = []
+            for cell in range(9):
+                i, j = divmod(cell, 3)
+                if reflected:
+                    i, j = reflect(i, j)
+                for _ in range(turns):
+                    i, j = rotate(i, j)
+                permutation.append(3 * i + j)
+            permutations.append(permutation)
+    return permutations
+
+
+SYMMETRIES = symmetries()
+
+# TRANSFORMS[s][bits] is the 9-bit pattern `bits` under symmetry s
+TRANSFORMS = [
+    [sum(1 << permutation[cell] for cell in range(9) if bits >> cell & 1) for bits in range(512)]
+    for permutation in SYMMETRIES
+]
+
+# INVERSES[s][cell] is the cell that symmetry s moves onto `cell`
+INVERSES = [
+    [permutation.index(cell) for cell in range(9)]
+    for permutation in SYMMETRIES
+]
+
+# Maps canonical keys to optimal moves, once loaded
+moves = None
+
+
+def canonical(x, o):
+    """
+    Returns (key, s): the smallest x << 9 | o key among the 8
+    symmetric images of the board, and the symmetry producing it.
+    """
+    return min((transform[x] << 9 | transform[o], s) for s, transform in enumerate(TRANSFORMS))
+
+
+def load(path=BOOK_PATH):
+    """
+    Reads a book file into a dictionary of canonical key to move.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    book = {}
+    for offset in range(0, len(data), ENTRY_SIZE):
+        entry = int.from_bytes(data[offset:offset + ENTRY_SIZE], "big")
+        book[entry >> 4] = entry & 0xF
+    return book
+
+
+def lookup(x, o):
+    """
+    Returns the book's optimal move for the board, or None if the
+    board is terminal or no book file is available.
+    """
+    global moves
+    if moves is None:
+        try:
+            moves = load()
+        except OSError:
+            moves = {}
+    key, s = canonical(x, o)
+    move = moves.get(key)
+    return None if move is None else INVERSES[s][move]
+
+
+def generate(path=BOOK_PATH):
+    """
+    Solves every reachable canonical position and writes the book.
+    Returns the number of positions stored.
+    """
+    book = {}
+    stack = [(0, 0)]
+    seen = set()
+    while stack:
+        x, o = stack.pop()
+        key, _ = canonical(x, o)
+        if key in seen:
+            continue
+        seen.add(key)
+        if bitboard.terminal(x, o):
+            continue
+        # Solve the canonical image itself, so the move is in its frame
+        cx, co = key >> 9, key & 0b111111111
+        book[key] = bitboard.search(cx, co)[1]
+        for move in bitboard.actions(x, o):
+            stack.append(bitboard.result(x, o, move))
+
+    with open(path, "wb") as f:
+        for key in sorted(book):
+            f.write((key << 4 | book[key]).to_bytes(ENTRY_SIZE, "big"))
+    return len(book)
+
+
+if __name__ == "__main__":
+    count = generate()
+    print(f"Wrote {count} positions to {BOOK_PATH}.")
@@ -0,0 +1,274 @@
+"""
+m,n,k-game player
+
+Generalizes Tic Tac Toe to an m-row, n-column board won by k in a row,
+such as 4x4 or 5x5 with 4 in a row. Boards use the same list-of-lists
+representation as tictactoe.py. Full minimax is intractable beyond 3x3,
+so `minimax` runs a time-budgeted iterative-deepening alpha-beta search
+with a heuristic evaluation.
+"""
+
+import math
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Scores above this mean a forced win, adjusted by plies to the win
+WIN = 10 ** 9
+
+# Line directions: right, down, down-right, down-left
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its deadline has passed."""
+
+
+class Game():
+    """
+    An m,n,k-game: players alternate placing marks on an m x n board,
+    and the first to get k in a row, column or diagonal wins.
+    """
+
+    def __init__(self, m=3, n=3, k=3):
+        if not 1 <= k <= max(m, n):
+            raise ValueError("k must fit on the board")
+        self.m = m
+        self.n = n
+        self.k = k
+        self.cancel = None
+
+        # Counts positions visited by `search`
+        self.nodes = 0
+
+        # Every run of k cells that could win, as flat cell indices
+        self.windows = []
+        for i in range(m):
+            for j in range(n):
+                for di, dj in DIRECTIONS:
+                    end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                    if 0 <= end_i < m and 0 <= end_j < n:
+                        self.windows.append([(i + di * t) * n + j + dj * t for t in range(k)])
+
+        # Maps each cell to the windows that include it
+        self.cell_windows = [[] for _ in range(m * n)]
+        for window in self.windows:
+            for cell in window:
+                self.cell_windows[cell].append(window)
+
+        # Moves tried first are the ones closest to the center
+        center_i, center_j = (m - 1) / 2, (n - 1) / 2
+        self.order = sorted(
+            range(m * n),
+            key=lambda cell: abs(cell // n - center_i) + abs(cell % n - center_j)
+        )
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return [[EMPTY] * self.n for _ in range(self.m)]
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        x_count = sum(row.count(X) for row in board)
+        o_count = sum(row.count(O) for row in board)
+        return X if x_count <= o_count else O
+
+    def actions(self, board):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        return {(i, j) for i, row in enumerate(board) for j, cell in enumerate(row) if cell is EMPTY}
+
+    def result(self, board, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        if board[i][j] is not EMPTY:
+            raise ValueError("Invalid move: Position already occupied")
+        new_board = [row[:] for row in board]
+        new_board[i][j] = self.player(board)
+        return new_board
+
+    def winner(self, board):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        cells = [cell for row in board for cell in row]
+        for window in self.windows:
+            first = cells[window[0]]
+            if first is not EMPTY and all(cells[cell] == first for cell in window):
+                return first
+        return None
+
+    def terminal(self, board):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return self.winner(board) is not None or all(cell is not EMPTY for row in board for cell in row)
+
+    def utility(self, board):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        win_player = self.winner(board)
+        if win_player == X:
+            return 1
+        elif win_player == O:
+            return -1
+        return 0
+
+    def evaluate(self, cells):
+        """
+        Heuristic value of a flat board from X's point of view: every
+        window still open to only one player counts for that player,
+        weighted by how many of its cells they already hold.
+        """
+        score = 0
+        for window in self.windows:
+            x_count = o_count = 0
+            for cell in window:
+                mark = cells[cell]
+                if mark == X:
+                    x_count += 1
+                elif mark == O:
+                    o_count += 1
+            if o_count == 0 and x_count:
+                score += 4 ** x_count
+            elif x_count == 0 and o_count:
+                score -= 4 ** o_count
+        return score
+
+    def minimax(self, board, time_limit=1.0, max_depth=None, cancel=None):
+        """
+        Returns the best action found for the current player within
+        `time_limit` seconds, or None on a finished board.
+
+        Searches depth 1, 2, ... with alpha-beta pruning, each pass
+        trying the previous pass's best move first, and returns the
+        move of the deepest pass that completed. The first pass
+        always completes, so some legal move is returned.
+
+        `cancel` may be a threading.Event; once it is set the search
+        stops as soon as possible and returns None.
+        """
+        if self.terminal(board):
+            return None
+        self.cancel = cancel
+        deadline = time.perf_counter() + time_limit
+        cells = [cell for row in board for cell in row]
+        mark = self.player(board)
+        empties = cells.count(EMPTY)
+        max_depth = min(max_depth or empties, empties)
+
+        best = None
+        for depth in range(1, max_depth + 1):
+            try:
+                value, move = self.search_root(cells, mark, depth, best, deadline if best is not None else math.inf)
+            except SearchTimeout:
+                break
+            best = move
+            if abs(value) >= WIN - self.m * self.n:
+                break
+        if best is None or self.cancelled():
+            return None
+        return divmod(best, self.n)
+
+    def search_root(self, cells, mark, depth, first, deadline):
+        """
+        Searches every move at the root to `depth` plies. Returns
+        (value, move) for the player `mark` to move.
+        """
+        moves = self.candidates(cells, first)
+        maximizing = mark == X
+        best_value, best_move = (-math.inf if maximizing else math.inf), moves[0]
+        alpha, beta = -math.inf, math.inf
+        for move in moves:
+            cells[move] = mark
+            try:
+                v = self.search(cells, move, depth - 1, 1, alpha, beta, deadline)
+            finally:
+                cells[move] = EMPTY
+            if maximizing and v > best_value or not maximizing and v < best_value:
+                best_value, best_move = v, move
+            if maximizing:
+                alpha = max(alpha, v)
+            else:
+                beta = min(beta, v)
+        return best_value, best_move
+
+    def search(self, cells, last, depth, ply, alpha, beta, deadline):
+        """
+        Alpha-beta search below the move `last`, which was just played
+        on the flat board `cells` (modified in place and restored).
+        Returns the value from X's point of view.
+        """
+        self.nodes += 1
+        if self.completes_window(cells, last):
+            return WIN - ply if cells[last] == X else ply - WIN
+        if depth == 0:
+            return self.evaluate(cells)
+        if time.perf_counter() > deadline or self.cancelled():
+            raise SearchTimeout
+
+        mark = O if cells[last] == X else X
+        moves = self.candidates(cells)
+        if not moves:
+            return 0
+
+        if mark == X:
+            v = -math.inf
+            for move in moves:
+                cells[move] = X
+                try:
+                    v = max(v, self.search(cells, move, depth - 1, ply + 1, alpha, beta, deadline))
+                finally:
+                    cells[move] = EMPTY
+                alpha = max(alpha, v)
+                if alpha >= beta:
+                    break
+        else:
+            v = math.inf
+            for move in moves:
+                cells[move] = O
+                try:
+                    v = min(v, self.search(cells, move, depth - 1, ply + 1, alpha, beta, deadline))
+                finally:
+                    cells[move] = EMPTY
+                beta = min(beta, v)
+                if alpha >= beta:
+                    break
+        return v
+
+    def cancelled(self):
+        """
+        Returns True if the running search has been asked to stop.
+        """
+        return self.cancel is not None and self.cancel.is_set()
+
+    def completes_window(self, cells, cell):
+        """
+        Returns True if the mark at flat index `cell` fills a window.
+        """
+        mark = cells[cell]
+        for window in self.cell_windows[cell]:
+            if all(cells[other] == mark for other in window):
+                return True
+        return False
+
+    def candidates(self, cells, first=None):
+        """
+        Returns the empty cells of a flat board, `first` then the
+        cells closest to the center.
+        """
+        moves = [cell for cell in self.order if cells[cell] is EMPTY]
+        if first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
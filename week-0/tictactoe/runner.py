@@ -1,9 +1,31 @@
+import os
 import pygame
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
+import mnk
 import tictactoe as ttt
 
+# Optional board size: python runner.py [rows columns in-a-row]
+if len(sys.argv) not in (1, 4):
+    sys.exit("Usage: python runner.py [m n k]")
+m, n, k = (int(arg) for arg in sys.argv[1:]) if len(sys.argv) == 4 else (3, 3, 3)
+
+# The exact 3x3 engine where it applies, a time-budgeted search elsewhere
+AI_TIME_LIMIT = 1.0
+if (m, n, k) == (3, 3, 3):
+    game = ttt
+
+    def think(board, cancel):
+        return ttt.minimax(board)
+else:
+    game = mnk.Game(m, n, k)
+
+    def think(board, cancel):
+        return game.minimax(board, AI_TIME_LIMIT, cancel=cancel)
+
 pygame.init()
 size = width, height = 600, 400
 
@@ -15,17 +37,72 @@ screen = pygame.display.set_mode(size)
 
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
-moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
+
+# Fit the board between the title and the bottom button
+tile_size = min(80, 240 // max(m, n))
+moveFont = pygame.font.Font("OpenSans-Regular.ttf", tile_size * 3 // 4)
 
 user = None
-board = ttt.initial_state()
-ai_turn = False
+board = game.initial_state()
+
+# The AI searches on a worker thread so the loop keeps drawing;
+# ai_cancel stops an outdated search when the game is reset
+executor = ThreadPoolExecutor(max_workers=1)
+ai_future = None
+ai_cancel = None
+
+# Frame-time instrumentation, reported every few seconds when the
+# FRAME_REPORT environment variable is set, e.g. FRAME_REPORT=1
+clock = pygame.time.Clock()
+FPS = 60
+REPORT_FRAMES = bool(os.environ.get("FRAME_REPORT"))
+REPORT_INTERVAL = 5
+frame_times = []
+last_report = time.perf_counter()
+
+
+def cancel_ai():
+    """
+    Abandons the AI search in progress, if any.
+    """
+    global ai_future, ai_cancel
+    if ai_future is not None:
+        ai_cancel.set()
+        ai_future.cancel()
+    ai_future = None
+    ai_cancel = None
+
 
 while True:
 
+    frame_time = clock.tick(FPS)
+    if REPORT_FRAMES:
+        frame_times.append(frame_time)
+        now = time.perf_counter()
+        if now - last_report >= REPORT_INTERVAL:
+            average = sum(frame_times) / len(frame_times)
+            print(f"frames: {len(frame_times)}, avg {average:.1f} ms, max {max(frame_times)} ms")
+            frame_times = []
+            last_report = now
+
+    # Clicks are taken from events, so no sleep is needed to debounce them;
+    # R resets the game at any time, even while the AI is thinking
+    click = None
+    reset = False
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            cancel_ai()
+            executor.shutdown(wait=False)
             sys.exit()
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            click = event.pos
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
+            reset = True
+
+    if reset:
+        cancel_ai()
+        user = None
+        board = game.initial_state()
 
     screen.fill(black)
 
@@ -54,26 +131,21 @@ while True:
         screen.blit(playO, playORect)
 
         # Check if button is clicked
-        click, _, _ = pygame.mouse.get_pressed()
-        if click == 1:
-            mouse = pygame.mouse.get_pos()
-            if playXButton.collidepoint(mouse):
-                time.sleep(0.2)
+        if click is not None:
+            if playXButton.collidepoint(click):
                 user = ttt.X
-            elif playOButton.collidepoint(mouse):
-                time.sleep(0.2)
+            elif playOButton.collidepoint(click):
                 user = ttt.O
 
     else:
 
         # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
+        tile_origin = (width / 2 - (n / 2 * tile_size),
+                       height / 2 - (m / 2 * tile_size))
         tiles = []
-        for i in range(3):
+        for i in range(m):
             row = []
-            for j in range(3):
+            for j in range(n):
                 rect = pygame.Rect(
                     tile_origin[0] + j * tile_size,
                     tile_origin[1] + i * tile_size,
@@ -89,12 +161,12 @@ while True:
                 row.append(rect)
             tiles.append(row)
 
-        game_over = ttt.terminal(board)
-        player = ttt.player(board)
+        game_over = game.terminal(board)
+        player = game.player(board)
 
         # Show title
         if game_over:
-            winner = ttt.winner(board)
+            winner = game.winner(board)
             if winner is None:
                 title = f"Game Over: Tie."
             else:
@@ -108,24 +180,24 @@ while True:
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Start the AI search, or apply its move once it is done
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if ai_future is None:
+                ai_cancel = threading.Event()
+                ai_future = executor.submit(think, [row[:] for row in board], ai_cancel)
+            elif ai_future.done():
+                move = ai_future.result()
+                ai_future = None
+                ai_cancel = None
+                if move is not None:
+                    board = game.result(board, move)
 
         # Check for a user move
-        click, _, _ = pygame.mouse.get_pressed()
-        if click == 1 and user == player and not game_over:
-            mouse = pygame.mouse.get_pos()
-            for i in range(3):
-                for j in range(3):
-                    if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
-                        board = ttt.result(board, (i, j))
+        if click is not None and user == player and not game_over:
+            for i in range(m):
+                for j in range(n):
+                    if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(click)):
+                        board = game.result(board, (i, j))
 
         if game_over:
             againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
@@ -134,13 +206,9 @@ while True:
             againRect.center = againButton.center
             pygame.draw.rect(screen, white, againButton)
             screen.blit(again, againRect)
-            click, _, _ = pygame.mouse.get_pressed()
-            if click == 1:
-                mouse = pygame.mouse.get_pos()
-                if againButton.collidepoint(mouse):
-                    time.sleep(0.2)
-                    user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
+            if click is not None and againButton.collidepoint(click):
+                cancel_ai()
+                user = None
+                board = game.initial_state()
 
     pygame.display.flip()
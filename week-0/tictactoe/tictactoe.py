@@ -2,7 +2,8 @@
 Tic Tac Toe Player
 """
 
-import math
+import bitboard
+import book
 
 X = "X"
 O = "O"
@@ -115,48 +116,25 @@ def utility(board):
     return 0
 
 
-def minimax(board):
+def value(board):
     """
-    Returns the optimal action for the current player on the board.
+    Returns the minimax value of the board: 1 if X wins with best play,
+    -1 if O wins, 0 for a tie.
     """
-    def max_value(board):
-        optimal_move = ()
-        if terminal(board):
-            return utility(board), optimal_move
-        else:
-            v = -5
-            for action in actions(board):
-                minval = min_value(result(board, action))[0]
-                if minval > v:
-                    v = minval
-                    optimal_move = action
-            return v, optimal_move
-
-    def min_value(board):
-        optimal_move = ()
-        if terminal(board):
-            return utility(board), optimal_move
-        else:
-            v = 5
-            for action in actions(board):
-                maxval = max_value(result(board, action))[0]
-                if maxval < v:
-                    v = maxval
-                    optimal_move = action
-            return v, optimal_move
-
-    curr_player = player(board)
-
-    if terminal(board):
-        return None
+    return bitboard.search(*bitboard.from_board(board))[0]
 
-    current_player = player(board)
-    X, O = 'X', 'O'  # Define player symbols
 
-    # Decide which function to use based on the current player
-    if current_player == X:
-        _, action = max_value(board)
-    else:
-        _, action = min_value(board)
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
 
-    return action
+    The move comes from the precomputed opening book, falling back to
+    a search on the bitboard engine if no book file is available.
+    """
+    x, o = bitboard.from_board(board)
+    if bitboard.terminal(x, o):
+        return None
+    move = book.lookup(x, o)
+    if move is None:
+        move = bitboard.search(x, o)[1]
+    return bitboard.to_action(move)
@@ -0,0 +1,236 @@
+"""
+Headless Tic Tac Toe tournament
+
+Plays many games between pluggable strategies across a process pool and
+reports win/draw/loss tables, per-move latency percentiles and nodes
+searched, as JSON for regression tracking.
+
+Usage: python tournament.py [--games N] [--strategies a,b,...] [--output FILE]
+"""
+
+import abc
+import argparse
+import json
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bitboard
+import mnk
+import tictactoe as ttt
+
+
+class Strategy(abc.ABC):
+    """
+    A player: `move(board)` returns an action and `nodes()` the number
+    of positions searched so far.
+    """
+
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+
+    @abc.abstractmethod
+    def move(self, board):
+        pass
+
+    def nodes(self):
+        return 0
+
+
+class RandomStrategy(Strategy):
+    """Plays a uniformly random legal move."""
+
+    def move(self, board):
+        return self.random.choice(sorted(ttt.actions(board)))
+
+
+class BitboardStrategy(Strategy):
+    """
+    A player using the bitboard search, with a transposition table and
+    killer moves of its own. bitboard keeps them in module globals, so
+    they are swapped in around each move: every game starts from a
+    cold table, and two such players in one game never share one.
+    """
+
+    def __init__(self, seed):
+        super().__init__(seed)
+        self.transpositions = {}
+        self.killers = {}
+
+    def move(self, board):
+        saved = bitboard.transpositions, bitboard.killers
+        bitboard.transpositions, bitboard.killers = self.transpositions, self.killers
+        try:
+            return self.search(board)
+        finally:
+            bitboard.transpositions, bitboard.killers = saved
+
+    @abc.abstractmethod
+    def search(self, board):
+        pass
+
+    def nodes(self):
+        return bitboard.search_stats["nodes"]
+
+
+class MinimaxStrategy(BitboardStrategy):
+    """The tictactoe.minimax player: opening book, then search."""
+
+    def search(self, board):
+        return ttt.minimax(board)
+
+
+class SearchStrategy(BitboardStrategy):
+    """The bitboard alpha-beta search, bypassing the opening book."""
+
+    def search(self, board):
+        return bitboard.to_action(bitboard.search(*bitboard.from_board(board))[1])
+
+
+class DeepeningStrategy(Strategy):
+    """The m,n,k iterative-deepening search with a 20 ms budget."""
+
+    time_limit = 0.02
+
+    def __init__(self, seed):
+        super().__init__(seed)
+        self.game = mnk.Game(3, 3, 3)
+
+    def move(self, board):
+        return self.game.minimax(board, self.time_limit)
+
+    def nodes(self):
+        return self.game.nodes
+
+
+# Maps strategy names to their classes; add new engines here
+STRATEGIES = {
+    "random": RandomStrategy,
+    "minimax": MinimaxStrategy,
+    "search": SearchStrategy,
+    "deepening": DeepeningStrategy
+}
+
+
+def play(x_name, o_name, seed):
+    """
+    Plays one game with freshly created players. Returns the winner ("X", "O" or None) and, for
+    each side, its move latencies in seconds and nodes searched.
+    """
+    players = {
+        ttt.X: STRATEGIES[x_name](seed),
+        ttt.O: STRATEGIES[o_name](seed + 1)
+    }
+    latencies = {ttt.X: [], ttt.O: []}
+    nodes = {ttt.X: 0, ttt.O: 0}
+    board = ttt.initial_state()
+    while not ttt.terminal(board):
+        mark = ttt.player(board)
+        strategy = players[mark]
+        before = strategy.nodes()
+        start = time.perf_counter()
+        action = strategy.move(board)
+        latencies[mark].append(time.perf_counter() - start)
+        nodes[mark] += strategy.nodes() - before
+        board = ttt.result(board, action)
+    return ttt.winner(board), latencies, nodes
+
+
+def play_match(x_name, o_name, games, seed):
+    """
+    Plays `games` games with fixed colors in one worker process and
+    returns the tallies and raw latencies.
+    """
+    match = {"x": x_name, "o": o_name, "x_wins": 0, "o_wins": 0, "draws": 0,
+             "latencies": {x_name: [], o_name: []}, "nodes": {x_name: 0, o_name: 0}}
+    for game in range(games):
+        winner, latencies, nodes = play(x_name, o_name, seed + 2 * game)
+        if winner == ttt.X:
+            match["x_wins"] += 1
+        elif winner == ttt.O:
+            match["o_wins"] += 1
+        else:
+            match["draws"] += 1
+        for mark, name in ((ttt.X, x_name), (ttt.O, o_name)):
+            match["latencies"][name].extend(latencies[mark])
+            match["nodes"][name] += nodes[mark]
+    return match
+
+
+def percentile(values, fraction):
+    """
+    Returns the value below which `fraction` of `values` fall.
+    """
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def tournament(names, games, processes=None, chunk=50, seed=0):
+    """
+    Plays `games` games for every ordered pair of strategies, split in
+    chunks over a process pool, and returns the report dictionary.
+    """
+    jobs = []
+    for x_name in names:
+        for o_name in names:
+            for start in range(0, games, chunk):
+                jobs.append((x_name, o_name, min(chunk, games - start), seed + 2 * start))
+
+    results = {}
+    latencies = {name: [] for name in names}
+    nodes = {name: 0 for name in names}
+    moves = {name: 0 for name in names}
+    with ProcessPoolExecutor(processes) as pool:
+        for match in pool.map(play_match, *zip(*jobs)):
+            key = f"{match['x']} vs {match['o']}"
+            tally = results.setdefault(key, {"x": match["x"], "o": match["o"],
+                                             "x_wins": 0, "o_wins": 0, "draws": 0})
+            for field in ("x_wins", "o_wins", "draws"):
+                tally[field] += match[field]
+            # A strategy playing itself appears twice in a match
+            for name in {match["x"], match["o"]}:
+                latencies[name].extend(match["latencies"][name])
+                nodes[name] += match["nodes"][name]
+                moves[name] += len(match["latencies"][name])
+
+    strategies = {}
+    for name in names:
+        strategies[name] = {
+            "moves": moves[name],
+            "nodes": nodes[name],
+            "nodes_per_move": nodes[name] / moves[name] if moves[name] else 0,
+            "latency_ms": {
+                label: percentile(latencies[name], fraction) * 1e3
+                for label, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0))
+            } if latencies[name] else {}
+        }
+    return {"games_per_pairing": games, "matches": list(results.values()), "strategies": strategies}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Tic Tac Toe tournament.")
+    parser.add_argument("--games", type=int, default=1000, help="games per ordered pairing")
+    parser.add_argument("--strategies", default=",".join(STRATEGIES),
+                        help=f"comma-separated subset of: {', '.join(STRATEGIES)}")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    names = args.strategies.split(",")
+    unknown = [name for name in names if name not in STRATEGIES]
+    if unknown:
+        sys.exit(f"Unknown strategies: {', '.join(unknown)}")
+
+    report = tournament(names, args.games, args.processes, seed=args.seed)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
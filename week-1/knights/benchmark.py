@@ -0,0 +1,189 @@
+import csv
+import json
+import os
+import sys
+import time
+
+import compiled
+import generator
+import logic
+import parallel
+import puzzle
+import sat
+import vectorized
+
+
+def timed(function, runs):
+    """
+    Returns the average seconds per call of `function` over `runs` calls.
+    """
+    start = time.perf_counter()
+    for _ in range(runs):
+        function()
+    return (time.perf_counter() - start) / runs
+
+
+def evaluation(runs=200):
+    """
+    Compares tree-walking `evaluate` with the compiled evaluator on
+    every model of knowledge3, then full model checks of each symbol.
+    """
+    knowledge = puzzle.knowledge3
+    kb, = compiled.compile_sentences(knowledge)
+    models = [kb.model(bits) for bits in range(1 << len(kb.symbols))]
+
+    tree = timed(lambda: [knowledge.evaluate(model) for model in models], runs)
+    flat = timed(lambda: [kb(bits) for bits in range(1 << len(kb.symbols))], runs)
+    print(f"evaluate all {len(models)} models of knowledge3:")
+    print(f"    tree walk: {tree * 1e6:10.1f} us")
+    print(f"    compiled:  {flat * 1e6:10.1f} us ({tree / flat:.1f}x)")
+
+    symbols = [puzzle.AKnight, puzzle.AKnave, puzzle.BKnight, puzzle.BKnave, puzzle.CKnight, puzzle.CKnave]
+    tree = timed(lambda: [logic.model_check(knowledge, symbol) for symbol in symbols], runs // 10)
+    flat = timed(lambda: [compiled.model_check(knowledge, symbol) for symbol in symbols], runs // 10)
+    print("model_check of six symbols against knowledge3:")
+    print(f"    tree walk: {tree * 1e3:10.2f} ms")
+    print(f"    compiled:  {flat * 1e3:10.2f} ms ({tree / flat:.1f}x, including compilation)")
+
+
+def chain(characters):
+    """
+    Returns a knights-and-knaves knowledge base over `characters`
+    characters, 2 * `characters` symbols, where each character says the
+    next one is a knave, and the symbols to query.
+    """
+    knights = [logic.Symbol(f"{i} is a Knight") for i in range(characters)]
+    knaves = [logic.Symbol(f"{i} is a Knave") for i in range(characters)]
+    knowledge = logic.And()
+    for i in range(characters):
+        knowledge.add(logic.Or(knights[i], knaves[i]))
+        knowledge.add(logic.Not(logic.And(knights[i], knaves[i])))
+        said = knaves[(i + 1) % characters]
+        knowledge.add(logic.Implication(knights[i], said))
+        knowledge.add(logic.Implication(knaves[i], logic.Not(said)))
+    return knowledge, knights + knaves
+
+
+def vectorized_check(characters=8):
+    """
+    Compares logic.model_check with the bit-parallel NumPy backend on a
+    synthetic puzzle large enough for the enumeration to dominate.
+    """
+    knowledge, symbols = chain(characters)
+    query = symbols[0]
+    tree = timed(lambda: logic.model_check(knowledge, query), 1)
+    bits = timed(lambda: vectorized.model_check(knowledge, query), 5)
+    print(f"model_check of one symbol, {len(symbols)} symbols ({1 << len(symbols)} models):")
+    print(f"    tree walk:  {tree * 1e3:10.2f} ms")
+    print(f"    vectorized: {bits * 1e3:10.2f} ms ({tree / bits:.0f}x)")
+
+    # An entailed query, so every model is enumerated
+    knowledge, symbols = chain(14)
+    query = logic.Or(symbols[0], symbols[14])
+    bits = timed(lambda: vectorized.model_check(knowledge, query), 1)
+    print(f"vectorized, {len(symbols)} symbols ({1 << len(symbols)} models): {bits:.2f} s")
+
+
+def parallel_check(characters=15):
+    """
+    Compares the vectorized backend on one process with parallel model
+    checking on every CPU, for a 30-symbol puzzle.
+    """
+    knowledge, symbols = chain(characters)
+    processes = os.cpu_count()
+    print(f"{len(symbols)} symbols ({1 << len(symbols)} models), {processes} processes:")
+
+    # An entailed query enumerates every model; a single symbol is
+    # refuted by a countermodel, which stops every worker
+    queries = [
+        ("entailed", logic.Or(symbols[0], symbols[characters])),
+        ("refuted", symbols[0])
+    ]
+    for name, query in queries:
+        one = timed(lambda: vectorized.model_check(knowledge, query), 1)
+        many = timed(lambda: parallel.model_check(knowledge, query, processes), 1)
+        print(f"    {name:8}  1 process: {one:6.2f} s  parallel: {many:6.2f} s ({one / many:.1f}x)")
+
+
+def each(check):
+    """
+    Returns a backend answering every query with one entailment check.
+    """
+    return lambda knowledge, queries: [check(knowledge, query) for query in queries]
+
+
+# Entailment backends: functions from a knowledge base and queries to
+# whether each query is entailed
+BACKENDS = {
+    "model_check": each(logic.model_check),
+    "model_check_all": lambda knowledge, queries: [
+        entailed for entailed, possible in logic.model_check_all(knowledge, queries)
+    ],
+    "compiled": each(compiled.model_check),
+    "vectorized": each(vectorized.model_check),
+    "parallel": each(parallel.model_check),
+    "sat": each(sat.entails)
+}
+
+# A backend is dropped once solving one puzzle takes longer than this
+BUDGET = 5.0
+
+
+def backends(max_characters=24):
+    """
+    Times every backend on generated puzzles as the number of
+    characters grows, asking whether each of the 2N symbols is entailed,
+    and writes the results to backends.csv and backends.json.
+    """
+    results = []
+    remaining = list(BACKENDS)
+    for characters in range(2, max_characters + 1):
+        if not remaining:
+            break
+        statements = characters + 2
+        puzzle = generator.generate(characters, statements, seed=characters)
+        symbols = puzzle.symbols()
+        expected = [puzzle.solution[name] for name in puzzle.names]
+        expected += [not entailed for entailed in expected]
+
+        for backend in list(remaining):
+            start = time.perf_counter()
+            answers = BACKENDS[backend](puzzle.knowledge, symbols)
+            seconds = time.perf_counter() - start
+            if answers != expected:
+                sys.exit(f"{backend} answered wrongly with {characters} characters")
+            results.append({
+                "characters": characters,
+                "statements": statements,
+                "symbols": len(symbols),
+                "backend": backend,
+                "seconds": seconds
+            })
+            print(f"{characters:3} characters  {backend:16} {seconds:10.4f} s")
+            if seconds > BUDGET:
+                remaining.remove(backend)
+
+    with open("backends.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0]))
+        writer.writeheader()
+        writer.writerows(results)
+    with open("backends.json", "w") as f:
+        json.dump(results, f, indent=2)
+
+
+COMMANDS = {
+    "evaluation": evaluation,
+    "vectorized": vectorized_check,
+    "parallel": parallel_check,
+    "backends": backends
+}
+
+
+def main():
+    if len(sys.argv) != 2 or sys.argv[1] not in COMMANDS:
+        sys.exit(f"Usage: python benchmark.py [{'|'.join(COMMANDS)}]")
+    COMMANDS[sys.argv[1]]()
+
+
+if __name__ == "__main__":
+    main()
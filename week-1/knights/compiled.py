@@ -0,0 +1,94 @@
+"""
+Compiled evaluation of logic.py sentences
+
+`Sentence.evaluate` walks the sentence tree and looks each symbol up
+by name for every model. Here a sentence is compiled once into a flat
+Python expression over an integer bitmask model, where symbol i is
+bit i, so evaluating a model is a single call with no dispatch and no
+dictionary lookups.
+"""
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+
+class Compiled():
+    """
+    A sentence compiled against an ordered list of symbol names.
+
+    Calling it with an integer model returns the sentence's truth
+    value when symbol `symbols[i]` has the value of bit i. The
+    function is built from the generated source on the first call.
+    """
+
+    def __init__(self, sentence, symbols):
+        self.symbols = list(symbols)
+        slots = {name: i for i, name in enumerate(self.symbols)}
+        body = expression(sentence, slots)
+        # Unpack only the bits the sentence uses, once per call
+        used = sorted(slots[name] for name in sentence.symbols())
+        unpack = "".join(f"    s{i} = m >> {i} & 1\n" for i in used)
+        self.source = f"def evaluate(m):\n{unpack}    return bool({body})\n"
+        self.function = None
+
+    def __call__(self, model):
+        if self.function is None:
+            namespace = {}
+            exec(self.source, namespace)
+            self.function = namespace["evaluate"]
+        return self.function(model)
+
+    def model(self, bits):
+        """
+        Returns the dictionary model that an integer model stands for.
+        """
+        return {name: bool(bits >> i & 1) for i, name in enumerate(self.symbols)}
+
+
+def expression(sentence, slots):
+    """
+    Returns Python source evaluating `sentence`, where symbol i has
+    been unpacked from the bitmask into the local `s<i>`.
+    """
+    if isinstance(sentence, Symbol):
+        try:
+            return f"s{slots[sentence.name]}"
+        except KeyError:
+            raise Exception(f"variable {sentence.name} not in model")
+    if isinstance(sentence, Not):
+        return f"(not {expression(sentence.operand, slots)})"
+    if isinstance(sentence, And):
+        # An empty conjunction is true and an empty disjunction false
+        if not sentence.conjuncts:
+            return "True"
+        return "(" + " and ".join(expression(c, slots) for c in sentence.conjuncts) + ")"
+    if isinstance(sentence, Or):
+        if not sentence.disjuncts:
+            return "False"
+        return "(" + " or ".join(expression(d, slots) for d in sentence.disjuncts) + ")"
+    if isinstance(sentence, Implication):
+        antecedent = expression(sentence.antecedent, slots)
+        consequent = expression(sentence.consequent, slots)
+        return f"(not {antecedent} or {consequent})"
+    if isinstance(sentence, Biconditional):
+        left = expression(sentence.left, slots)
+        right = expression(sentence.right, slots)
+        return f"((not {left}) == (not {right}))"
+    raise TypeError(f"cannot compile {type(sentence).__name__}")
+
+
+def compile_sentences(*sentences):
+    """
+    Compiles sentences against one shared, sorted list of all their
+    symbols, so the same integer model means the same thing to each.
+    """
+    symbols = sorted(set.union(*[sentence.symbols() for sentence in sentences]))
+    return [Compiled(sentence, symbols) for sentence in sentences]
+
+
+def model_check(knowledge, query):
+    """Checks if knowledge base entails query."""
+    kb, q = compile_sentences(knowledge, query)
+    for model in range(1 << len(kb.symbols)):
+        if kb(model) and not q(model):
+            return False
+    return True
@@ -0,0 +1,168 @@
+"""
+Random knights-and-knaves puzzles
+
+A puzzle is built backwards from a hidden assignment of knights and
+knaves. Each statement is a random claim about the characters, said by
+a character whose kind makes the claim consistent with the hidden
+assignment: knights say true claims and knaves false ones. Statements
+are chosen to rule out the other solutions the SAT solver finds, so
+every generated puzzle has exactly one solution.
+"""
+
+import random
+
+import sat
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+# Tries per statement at ruling out another solution, and per puzzle
+CANDIDATES = 200
+ATTEMPTS = 20
+
+
+class Puzzle():
+    """
+    A generated puzzle: `knowledge` encodes the rules and statements in
+    the style of puzzle.py, and `solution` maps each character's name
+    to True for a knight and False for a knave.
+    """
+
+    def __init__(self, names):
+        self.names = names
+        self.knights = [Symbol(f"{name} is a Knight") for name in names]
+        self.knaves = [Symbol(f"{name} is a Knave") for name in names]
+        self.statements = []
+        self.solution = {}
+
+        # Every character is either a knight or a knave, but not both
+        self.knowledge = And()
+        for knight, knave in zip(self.knights, self.knaves):
+            self.knowledge.add(Not(And(knight, knave)))
+            self.knowledge.add(Or(knight, knave))
+
+    def symbols(self):
+        return self.knights + self.knaves
+
+    def say(self, speaker, claim):
+        """
+        Adds the statement that character `speaker` says `claim`.
+        """
+        self.statements.append((self.names[speaker], claim))
+        self.knowledge.add(Implication(self.knights[speaker], claim))
+        self.knowledge.add(Implication(self.knaves[speaker], Not(claim)))
+
+    def model(self, solution):
+        """
+        Returns the model of every symbol for a solution.
+        """
+        model = {}
+        for name, knight, knave in zip(self.names, self.knights, self.knaves):
+            model[knight.name] = solution[name]
+            model[knave.name] = not solution[name]
+        return model
+
+    def other_solution(self):
+        """
+        Returns a solution consistent with the statements other than
+        the hidden one, or None if the puzzle is uniquely solvable.
+        """
+        hidden = And(*[knight if self.solution[name] else Not(knight)
+                       for name, knight in zip(self.names, self.knights)])
+        model = sat.satisfiable(And(self.knowledge, Not(hidden)))
+        if model is None:
+            return None
+        return {name: model.get(knight.name, False)
+                for name, knight in zip(self.names, self.knights)}
+
+    def __str__(self):
+        lines = [f"{speaker} says \"{claim.formula()}\"" for speaker, claim in self.statements]
+        return "\n".join(lines)
+
+
+def names(characters):
+    """
+    Returns character names: letters while they last, then numbered.
+    """
+    if characters <= 26:
+        return [chr(ord("A") + i) for i in range(characters)]
+    return [f"P{i}" for i in range(characters)]
+
+
+def claim(puzzle, rng, depth=2):
+    """
+    Returns a random sentence about the kinds of the characters.
+    """
+    if depth == 0 or rng.random() < 0.3:
+        i = rng.randrange(len(puzzle.names))
+        return rng.choice((puzzle.knights, puzzle.knaves))[i]
+    kind = rng.randrange(5)
+    if kind == 0:
+        return Not(claim(puzzle, rng, depth - 1))
+    if kind == 1:
+        return And(claim(puzzle, rng, depth - 1), claim(puzzle, rng, depth - 1))
+    if kind == 2:
+        return Or(claim(puzzle, rng, depth - 1), claim(puzzle, rng, depth - 1))
+    if kind == 3:
+        return Implication(claim(puzzle, rng, depth - 1), claim(puzzle, rng, depth - 1))
+    return Biconditional(claim(puzzle, rng, depth - 1), claim(puzzle, rng, depth - 1))
+
+
+def statement(puzzle, rng, model):
+    """
+    Returns a random (speaker, claim) pair consistent with the hidden
+    solution, or None if the claim suits no character.
+    """
+    sentence = claim(puzzle, rng)
+    truth = sentence.evaluate(model)
+    speakers = [i for i, name in enumerate(puzzle.names) if puzzle.solution[name] == truth]
+    if not speakers:
+        return None
+    return rng.choice(speakers), sentence
+
+
+def generate(characters, statements, seed=None):
+    """
+    Returns a uniquely solvable Puzzle with `characters` characters and
+    `statements` statements. Raises ValueError if no such puzzle was
+    found, usually because there are too few statements.
+    """
+    rng = random.Random(seed)
+    for _ in range(ATTEMPTS):
+        puzzle = Puzzle(names(characters))
+        puzzle.solution = {name: rng.random() < 0.5 for name in puzzle.names}
+        model = puzzle.model(puzzle.solution)
+
+        for _ in range(statements):
+            other = puzzle.other_solution()
+            other_model = None if other is None else puzzle.model(other)
+
+            # Prefer a statement that the other solution contradicts
+            chosen = None
+            for _ in range(CANDIDATES):
+                candidate = statement(puzzle, rng, model)
+                if candidate is None:
+                    continue
+                chosen = candidate
+                if other_model is None:
+                    break
+                speaker, sentence = candidate
+                if other[puzzle.names[speaker]] != sentence.evaluate(other_model):
+                    break
+            if chosen is None:
+                break
+            puzzle.say(*chosen)
+
+        if len(puzzle.statements) == statements and puzzle.other_solution() is None:
+            return puzzle
+    raise ValueError(f"no uniquely solvable puzzle with {characters} characters "
+                     f"and {statements} statements")
+
+
+def main():
+    puzzle = generate(5, 6, seed=0)
+    print(puzzle)
+    for name in puzzle.names:
+        print(f"    {name} is a {'Knight' if puzzle.solution[name] else 'Knave'}")
+
+
+if __name__ == "__main__":
+    main()
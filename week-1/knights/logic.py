@@ -3,17 +3,63 @@ import itertools
 
 class Sentence():
 
+    # Caches hold the symbol set and hash of a node. And.add bumps the
+    # generation, which invalidates every cache computed before it, since
+    # the conjunction may be nested anywhere inside other sentences.
+    __slots__ = ("_generation", "_symbols", "_hash")
+    generation = 0
+
+    def __init__(self):
+        self._generation = None
+
+    def __hash__(self):
+        self.refresh()
+        if self._hash is None:
+            self._hash = self.compute_hash()
+        return self._hash
+
+    def refresh(self):
+        """Drops cached values computed before the last And.add."""
+        if self._generation != Sentence.generation:
+            self._generation = Sentence.generation
+            self._symbols = None
+            self._hash = None
+
+    def compute_hash(self):
+        return id(self)
+
+    def parts(self):
+        """Returns the sentences this sentence is built from."""
+        return ()
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
 
+    def evaluate_partial(self, model):
+        """
+        Evaluates the logical sentence in a model that may leave symbols
+        unassigned: True or False if every completion of the model
+        agrees, otherwise None.
+        """
+        raise Exception("nothing to evaluate")
+
     def formula(self):
         """Returns string formula representing logical sentence."""
         return ""
 
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        return set(self.symbol_set())
+
+    def symbol_set(self):
+        """Returns the cached frozenset of all symbols in the sentence."""
+        self.refresh()
+        if self._symbols is None:
+            self._symbols = frozenset().union(
+                *[part.symbol_set() for part in self.parts()]
+            )
+        return self._symbols
 
     @classmethod
     def validate(cls, sentence):
@@ -43,8 +89,10 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
 
     def __init__(self, name):
+        Sentence.__init__(self)
         self.name = name
 
     def __eq__(self, other):
@@ -62,51 +110,77 @@ class Symbol(Sentence):
         except KeyError:
             raise Exception(f"variable {self.name} not in model")
 
+    def evaluate_partial(self, model):
+        value = model.get(self.name)
+        return None if value is None else bool(value)
+
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def symbol_set(self):
+        self.refresh()
+        if self._symbols is None:
+            self._symbols = frozenset((self.name,))
+        return self._symbols
 
 
 class Not(Sentence):
+    __slots__ = ("operand",)
+
     def __init__(self, operand):
+        Sentence.__init__(self)
         Sentence.validate(operand)
         self.operand = operand
 
     def __eq__(self, other):
         return isinstance(other, Not) and self.operand == other.operand
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def compute_hash(self):
         return hash(("not", hash(self.operand)))
 
+    def parts(self):
+        return (self.operand,)
+
     def __repr__(self):
         return f"Not({self.operand})"
 
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
+    def evaluate_partial(self, model):
+        value = self.operand.evaluate_partial(model)
+        return None if value is None else not value
+
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
-
 
 class And(Sentence):
+    __slots__ = ("conjuncts",)
+
     def __init__(self, *conjuncts):
+        Sentence.__init__(self)
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return (isinstance(other, And)
+                and hash(self) == hash(other)
+                and self.conjuncts == other.conjuncts)
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def compute_hash(self):
         return hash(
             ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
         )
 
+    def parts(self):
+        return self.conjuncts
+
     def __repr__(self):
         conjunctions = ", ".join(
             [str(conjunct) for conjunct in self.conjuncts]
@@ -114,36 +188,62 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
+        """
+        Appends a conjunct. Sentences do not know which others contain
+        them, so this invalidates the cached symbols and hashes of every
+        sentence, not just of this conjunction and the nodes above it.
+        Each sentence recomputes its caches at most once, the next time
+        they are used, which is cheap as long as knowledge is built up
+        before it is queried rather than in between queries.
+        """
         Sentence.validate(conjunct)
         self.conjuncts.append(conjunct)
+        Sentence.generation += 1
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
+    def evaluate_partial(self, model):
+        result = True
+        for conjunct in self.conjuncts:
+            value = conjunct.evaluate_partial(model)
+            if value is False:
+                return False
+            if value is None:
+                result = None
+        return result
+
     def formula(self):
         if len(self.conjuncts) == 1:
             return self.conjuncts[0].formula()
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
-
 
 class Or(Sentence):
+    __slots__ = ("disjuncts",)
+
     def __init__(self, *disjuncts):
+        Sentence.__init__(self)
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
         self.disjuncts = list(disjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return (isinstance(other, Or)
+                and hash(self) == hash(other)
+                and self.disjuncts == other.disjuncts)
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def compute_hash(self):
         return hash(
             ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
         )
 
+    def parts(self):
+        return self.disjuncts
+
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
         return f"Or({disjuncts})"
@@ -151,18 +251,28 @@ class Or(Sentence):
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
+    def evaluate_partial(self, model):
+        result = False
+        for disjunct in self.disjuncts:
+            value = disjunct.evaluate_partial(model)
+            if value is True:
+                return True
+            if value is None:
+                result = None
+        return result
+
     def formula(self):
         if len(self.disjuncts) == 1:
             return self.disjuncts[0].formula()
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
-
 
 class Implication(Sentence):
+    __slots__ = ("antecedent", "consequent")
+
     def __init__(self, antecedent, consequent):
+        Sentence.__init__(self)
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
         self.antecedent = antecedent
@@ -173,9 +283,14 @@ class Implication(Sentence):
                 and self.antecedent == other.antecedent
                 and self.consequent == other.consequent)
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def compute_hash(self):
         return hash(("implies", hash(self.antecedent), hash(self.consequent)))
 
+    def parts(self):
+        return (self.antecedent, self.consequent)
+
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
 
@@ -183,17 +298,28 @@ class Implication(Sentence):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
 
+    def evaluate_partial(self, model):
+        antecedent = self.antecedent.evaluate_partial(model)
+        if antecedent is False:
+            return True
+        consequent = self.consequent.evaluate_partial(model)
+        if consequent is True:
+            return True
+        if antecedent is True and consequent is False:
+            return False
+        return None
+
     def formula(self):
         antecedent = Sentence.parenthesize(self.antecedent.formula())
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
-
 
 class Biconditional(Sentence):
+    __slots__ = ("left", "right")
+
     def __init__(self, left, right):
+        Sentence.__init__(self)
         Sentence.validate(left)
         Sentence.validate(right)
         self.left = left
@@ -204,9 +330,14 @@ class Biconditional(Sentence):
                 and self.left == other.left
                 and self.right == other.right)
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def compute_hash(self):
         return hash(("biconditional", hash(self.left), hash(self.right)))
 
+    def parts(self):
+        return (self.left, self.right)
+
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
@@ -216,48 +347,130 @@ class Biconditional(Sentence):
                 or (not self.left.evaluate(model)
                     and not self.right.evaluate(model)))
 
+    def evaluate_partial(self, model):
+        left = self.left.evaluate_partial(model)
+        if left is None:
+            return None
+        right = self.right.evaluate_partial(model)
+        if right is None:
+            return None
+        return left == right
+
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
+
+def occurrences(sentence, counts):
+    """Counts how many times each symbol appears in a sentence."""
+    if isinstance(sentence, Symbol):
+        counts[sentence.name] = counts.get(sentence.name, 0) + 1
+    for part in sentence.parts():
+        occurrences(part, counts)
+    return counts
 
 
 def model_check(knowledge, query):
     """Checks if knowledge base entails query."""
 
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
+    def check_all(index):
+        """
+        Checks if knowledge base entails query in every completion of
+        the model, which assigns the symbols before `index`.
+        """
 
-        # If model has an assignment for each symbol
-        if not symbols:
-
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
+        # If knowledge base is already false, no completion can contradict query
+        kb = knowledge.evaluate_partial(model)
+        if kb is False:
             return True
-        else:
-
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
-
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
 
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
-
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
-
-    # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+        # If query is already settled, every completion agrees
+        q = query.evaluate_partial(model)
+        if q is True:
+            return True
+        if kb is True and q is False:
+            return False
+
+        # Choose the next unused symbol, trying both values in the same model
+        p = symbols[index]
+        model[p] = True
+        entailed = check_all(index + 1)
+        if entailed:
+            model[p] = False
+            entailed = check_all(index + 1)
+        del model[p]
+        return entailed
+
+    # Branch first on the symbols that appear most often in the knowledge
+    # base, since assigning them settles the most subformulas
+    counts = occurrences(knowledge, {})
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()),
+                     key=lambda name: (-counts.get(name, 0), name))
+    model = dict()
 
     # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+    return check_all(0)
+
+
+def model_check_all(knowledge, queries):
+    """
+    Checks many queries against one knowledge base in a single pass
+    over the models of the knowledge base. Returns, for each query in
+    order, a pair (entailed, possible): whether the query is true in
+    every model of the knowledge base, and whether it is true in any.
+    """
+    entailed = [True] * len(queries)
+    possible = [False] * len(queries)
+
+    # Queries still worth evaluating: a query that is possible but not
+    # entailed cannot change any further
+    undecided = set(range(len(queries)))
+
+    def check_all(index):
+        """
+        Visits every completion of the model, which assigns the symbols
+        before `index`, in which the knowledge base is true.
+        """
+        if not undecided:
+            return
+
+        # If knowledge base is already false, no completion is a model of it
+        kb = knowledge.evaluate_partial(model)
+        if kb is False:
+            return
+
+        # If knowledge base is true in every completion, settle each query
+        # that every completion agrees on
+        if kb is True:
+            pending = False
+            for i in list(undecided):
+                q = queries[i].evaluate_partial(model)
+                if q is None:
+                    pending = True
+                    continue
+                if q:
+                    possible[i] = True
+                else:
+                    entailed[i] = False
+                if possible[i] and not entailed[i]:
+                    undecided.discard(i)
+            if not pending:
+                return
+
+        # Choose the next unused symbol, trying both values in the same model
+        p = symbols[index]
+        model[p] = True
+        check_all(index + 1)
+        model[p] = False
+        check_all(index + 1)
+        del model[p]
+
+    counts = occurrences(knowledge, {})
+    symbols = set.union(knowledge.symbols(),
+                        *[query.symbols() for query in queries])
+    symbols = sorted(symbols, key=lambda name: (-counts.get(name, 0), name))
+    model = dict()
+
+    check_all(0)
+    return list(zip(entailed, possible))
@@ -0,0 +1,87 @@
+"""
+Parallel model checking across worker processes
+
+Fixing the values of the k highest symbols splits the 2^n models into
+2^k independent blocks of consecutive models, and each block is
+checked by a worker with the bit-parallel evaluator in vectorized.py.
+Sentences are compiled once and the pickled programs are sent to each
+worker when it starts. A shared event tells every worker to stop as
+soon as any of them finds a countermodel.
+"""
+
+import multiprocessing
+import os
+
+import vectorized
+
+# Per worker process: the compiled sentences, the number of symbols and
+# the event set when a countermodel has been found
+worker_knowledge = None
+worker_query = None
+worker_count = 0
+worker_found = None
+
+
+def start_worker(knowledge, query, count, found):
+    """
+    Pool initializer: keeps the compiled sentences and the shared event
+    for every block this worker checks.
+    """
+    global worker_knowledge, worker_query, worker_count, worker_found
+    worker_knowledge = knowledge
+    worker_query = query
+    worker_count = count
+    worker_found = found
+
+
+def check_block(block):
+    """
+    Checks the words of models [start, stop) of a block. Returns False
+    if it holds a countermodel, None if another worker found one first
+    and True otherwise.
+    """
+    start, stop = block
+    for chunk_start in range(start, stop, vectorized.CHUNK_WORDS):
+        if worker_found.is_set():
+            return None
+        words = min(vectorized.CHUNK_WORDS, stop - chunk_start)
+        chunk = vectorized.columns(worker_count, chunk_start, words)
+        knowledge = vectorized.run(worker_knowledge, chunk, words)
+        if (knowledge & ~vectorized.run(worker_query, chunk, words)).any():
+            worker_found.set()
+            return False
+    return True
+
+
+def model_check(knowledge, query, processes=None, fixed=None):
+    """
+    Checks if knowledge base entails query, splitting the models into
+    2^`fixed` blocks over `processes` workers. By default there is a
+    worker per CPU and about four blocks per worker, so that workers
+    that finish early pick up more.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    slots = {name: i for i, name in enumerate(symbols)}
+    knowledge_program = vectorized.compile_postfix(knowledge, slots)
+    query_program = vectorized.compile_postfix(query, slots)
+
+    count = len(symbols)
+    if processes is None:
+        processes = os.cpu_count()
+    if fixed is None:
+        fixed = (processes * 4 - 1).bit_length()
+
+    # Blocks must be whole words: the fixed symbols come after the six
+    # that vary within a word
+    if processes == 1 or count - 6 < fixed:
+        return vectorized.model_check(knowledge, query)
+
+    span = (1 << (count - 6)) >> fixed
+    blocks = [(i * span, (i + 1) * span) for i in range(1 << fixed)]
+    found = multiprocessing.Event()
+    args = (knowledge_program, query_program, count, found)
+    with multiprocessing.Pool(processes, start_worker, args) as pool:
+        for entailed in pool.imap_unordered(check_block, blocks):
+            if entailed is False:
+                return False
+    return True
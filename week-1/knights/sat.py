@@ -0,0 +1,337 @@
+"""
+CNF compilation and a CDCL SAT solver for logic.py sentences
+
+`entails(knowledge, query)` answers the same question as
+`logic.model_check`, but by refutation: the knowledge base entails the
+query exactly when knowledge ∧ ¬query is unsatisfiable. Sentences are
+turned into clauses with the Tseitin encoding, so the CNF grows
+linearly with the sentence, and the clauses are decided by DPLL with
+unit propagation over watched literals and conflict-driven clause
+learning.
+"""
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+
+class CNF():
+    """
+    Clauses over integer variables. Variable v stands for a symbol or
+    a Tseitin subformula; literal v means it is true, -v false.
+    """
+
+    def __init__(self):
+        self.clauses = []
+        # Maps symbol names to their variables
+        self.variables = {}
+        # Maps already encoded subformulas to their literals
+        self.encoded = {}
+        self.count = 0
+
+    def new_variable(self):
+        self.count += 1
+        return self.count
+
+    def variable(self, name):
+        """
+        Returns the variable standing for the symbol `name`.
+        """
+        if name not in self.variables:
+            self.variables[name] = self.new_variable()
+        return self.variables[name]
+
+    def add(self, sentence):
+        """
+        Adds clauses requiring `sentence` to be true.
+        """
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append([self.literal(disjunct) for disjunct in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            self.clauses.append([-self.literal(sentence.antecedent), self.literal(sentence.consequent)])
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """
+        Returns a literal equivalent to `sentence`, adding the Tseitin
+        clauses that define any new variable it needs.
+        """
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.encoded:
+            return self.encoded[sentence]
+
+        if isinstance(sentence, And):
+            parts = [self.literal(conjunct) for conjunct in sentence.conjuncts]
+            a = self.new_variable()
+            # a -> every part; all parts -> a
+            for part in parts:
+                self.clauses.append([-a, part])
+            self.clauses.append([a] + [-part for part in parts])
+        elif isinstance(sentence, Or):
+            parts = [self.literal(disjunct) for disjunct in sentence.disjuncts]
+            a = self.new_variable()
+            # a -> some part; any part -> a
+            self.clauses.append([-a] + parts)
+            for part in parts:
+                self.clauses.append([a, -part])
+        elif isinstance(sentence, Implication):
+            p = self.literal(sentence.antecedent)
+            q = self.literal(sentence.consequent)
+            a = self.new_variable()
+            # a <-> (¬p ∨ q)
+            self.clauses.append([-a, -p, q])
+            self.clauses.append([a, p])
+            self.clauses.append([a, -q])
+        elif isinstance(sentence, Biconditional):
+            p = self.literal(sentence.left)
+            q = self.literal(sentence.right)
+            a = self.new_variable()
+            # a <-> (p <-> q)
+            self.clauses.append([-a, -p, q])
+            self.clauses.append([-a, p, -q])
+            self.clauses.append([a, p, q])
+            self.clauses.append([a, -p, -q])
+        else:
+            raise TypeError(f"cannot convert {type(sentence).__name__} to CNF")
+
+        self.encoded[sentence] = a
+        return a
+
+
+class Solver():
+    """
+    CDCL SAT solver: unit propagation over two watched literals per
+    clause, first-UIP clause learning with non-chronological
+    backjumping, and activity-based branching with phase saving.
+    """
+
+    decay = 0.95
+
+    def __init__(self, cnf):
+        self.variables = cnf.count
+        size = self.variables + 1
+        # Per variable: 1 true, -1 false, 0 unassigned
+        self.values = [0] * size
+        self.levels = [0] * size
+        self.reasons = [None] * size
+        self.activity = [0.0] * size
+        self.phase = [-1] * size
+        self.bump = 1.0
+
+        self.trail = []
+        self.trail_limits = []
+        self.head = 0
+        self.clauses = []
+        self.watches = {}
+        self.conflicted = False
+
+        for clause in cnf.clauses:
+            self.add_clause(clause)
+
+    def value(self, literal):
+        v = self.values[abs(literal)]
+        return v if literal > 0 else -v
+
+    def add_clause(self, clause):
+        """
+        Adds an input clause at decision level 0.
+        """
+        clause = list(dict.fromkeys(clause))
+        if any(-literal in clause for literal in clause):
+            return
+        if not clause:
+            self.conflicted = True
+        elif len(clause) == 1:
+            if self.value(clause[0]) == -1:
+                self.conflicted = True
+            elif self.value(clause[0]) == 0:
+                self.assign(clause[0], None)
+        else:
+            self.watch(clause)
+
+    def watch(self, clause):
+        """
+        Stores a clause of two or more literals, watching the first two.
+        Returns its index.
+        """
+        index = len(self.clauses)
+        self.clauses.append(clause)
+        self.watches.setdefault(clause[0], []).append(index)
+        self.watches.setdefault(clause[1], []).append(index)
+        return index
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.values[variable] = 1 if literal > 0 else -1
+        self.levels[variable] = len(self.trail_limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal forced by unit clauses. Returns the index
+        of a conflicting clause, or None.
+        """
+        while self.head < len(self.trail):
+            false_literal = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches.get(false_literal, [])
+            kept = []
+            for position, index in enumerate(watching):
+                clause = self.clauses[index]
+                # Keep the false literal in slot 1
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.value(clause[0]) == 1:
+                    kept.append(index)
+                    continue
+
+                # Look for a replacement literal to watch
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) != -1:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches.setdefault(clause[1], []).append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if self.value(clause[0]) == -1:
+                        kept.extend(watching[position + 1:])
+                        self.watches[false_literal] = kept
+                        return index
+                    self.assign(clause[0], index)
+            self.watches[false_literal] = kept
+        return None
+
+    def analyze(self, conflict):
+        """
+        Derives the first-UIP clause from a conflict. Returns the learnt
+        clause, asserting literal first, and the level to jump back to.
+        """
+        level = len(self.trail_limits)
+        seen = set()
+        learnt = [None]
+        pending = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = self.clauses[conflict]
+
+        while True:
+            # A reason clause holds the literal it implied in slot 0
+            for other in (clause if literal is None else clause[1:]):
+                variable = abs(other)
+                if variable in seen or self.levels[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.bump_activity(variable)
+                if self.levels[variable] == level:
+                    pending += 1
+                else:
+                    learnt.append(other)
+
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reasons[abs(literal)]]
+
+        learnt[0] = -literal
+        if len(learnt) == 1:
+            return learnt, 0
+        # Watch the literal from the deepest remaining level second
+        deepest = max(range(1, len(learnt)), key=lambda i: self.levels[abs(learnt[i])])
+        learnt[1], learnt[deepest] = learnt[deepest], learnt[1]
+        return learnt, self.levels[abs(learnt[1])]
+
+    def bump_activity(self, variable):
+        self.activity[variable] += self.bump
+        if self.activity[variable] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.bump *= 1e-100
+
+    def backtrack(self, level):
+        """
+        Undoes every assignment made above decision level `level`.
+        """
+        if len(self.trail_limits) <= level:
+            return
+        start = self.trail_limits[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phase[variable] = self.values[variable]
+            self.values[variable] = 0
+            self.reasons[variable] = None
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.head = start
+
+    def decide(self):
+        """
+        Returns the unassigned variable with the highest activity, as a
+        literal in its last phase, or None if all are assigned.
+        """
+        best, best_activity = None, -1.0
+        for variable in range(1, self.variables + 1):
+            if self.values[variable] == 0 and self.activity[variable] > best_activity:
+                best, best_activity = variable, self.activity[variable]
+        if best is None:
+            return None
+        return best if self.phase[best] == 1 else -best
+
+    def solve(self):
+        """
+        Returns True if the clauses are satisfiable, False otherwise.
+        """
+        if self.conflicted:
+            return False
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if not self.trail_limits:
+                    return False
+                learnt, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learnt) == 1:
+                    self.assign(learnt[0], None)
+                else:
+                    self.assign(learnt[0], self.watch(learnt))
+                self.bump /= self.decay
+            else:
+                literal = self.decide()
+                if literal is None:
+                    return True
+                self.trail_limits.append(len(self.trail))
+                self.assign(literal, None)
+
+    def model(self, cnf):
+        """
+        Returns the satisfying assignment of the symbols in `cnf`
+        after a successful `solve`.
+        """
+        return {name: self.values[variable] == 1 for name, variable in cnf.variables.items()}
+
+
+def satisfiable(sentence):
+    """
+    Returns a model of `sentence` as a dictionary of symbol names to
+    truth values, or None if it is unsatisfiable.
+    """
+    cnf = CNF()
+    cnf.add(sentence)
+    solver = Solver(cnf)
+    return solver.model(cnf) if solver.solve() else None
+
+
+def entails(knowledge, query):
+    """Checks if knowledge base entails query."""
+    cnf = CNF()
+    cnf.add(knowledge)
+    cnf.add(Not(query))
+    return not Solver(cnf).solve()
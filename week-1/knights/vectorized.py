@@ -0,0 +1,134 @@
+"""
+Bit-parallel model checking with NumPy
+
+Enumerates all 2^n models in chunks, 64 models per uint64 word: bit b
+of word w is model 64 * w + b, and symbol i is true in a model when
+bit i of the model's index is set. A sentence is compiled once into a
+postfix program of bitwise operations that evaluates a whole chunk of
+models at a time. Only one chunk of columns is alive at once, so
+memory stays bounded however many symbols there are.
+"""
+
+import numpy as np
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+ALL = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+# PATTERNS[i] has bit b set when bit i of b is set: symbol i within a word
+PATTERNS = [np.uint64(sum(1 << b for b in range(64) if b >> i & 1)) for i in range(6)]
+
+# Words per chunk: 2^14 words hold 2^20 models
+CHUNK_WORDS = 1 << 14
+
+
+def compile_postfix(sentence, slots):
+    """
+    Returns `sentence` as a postfix program: a list of (operation,
+    argument) pairs where "load" pushes a symbol's column and the
+    other operations pop their operands and push the result.
+    """
+    program = []
+
+    def emit(sentence):
+        if isinstance(sentence, Symbol):
+            try:
+                program.append(("load", slots[sentence.name]))
+            except KeyError:
+                raise Exception(f"variable {sentence.name} not in model")
+        elif isinstance(sentence, Not):
+            emit(sentence.operand)
+            program.append(("not", None))
+        elif isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                emit(conjunct)
+            program.append(("and", len(sentence.conjuncts)))
+        elif isinstance(sentence, Or):
+            for disjunct in sentence.disjuncts:
+                emit(disjunct)
+            program.append(("or", len(sentence.disjuncts)))
+        elif isinstance(sentence, Implication):
+            emit(sentence.antecedent)
+            emit(sentence.consequent)
+            program.append(("implies", None))
+        elif isinstance(sentence, Biconditional):
+            emit(sentence.left)
+            emit(sentence.right)
+            program.append(("iff", None))
+        else:
+            raise TypeError(f"cannot compile {type(sentence).__name__}")
+
+    emit(sentence)
+    return program
+
+
+def run(program, columns, words):
+    """
+    Runs a postfix program over symbol columns of `words` words,
+    returning the column of the sentence's truth values.
+    """
+    stack = []
+    for operation, argument in program:
+        if operation == "load":
+            stack.append(columns[argument])
+        elif operation == "not":
+            stack.append(~stack.pop())
+        elif argument == 0:
+            # An empty conjunction is true and an empty disjunction false
+            stack.append(np.full(words, ALL if operation == "and" else 0, dtype=np.uint64))
+        elif operation == "and" or operation == "or":
+            operands = stack[-argument:]
+            del stack[-argument:]
+            combined = operands[0].copy()
+            for operand in operands[1:]:
+                if operation == "and":
+                    combined &= operand
+                else:
+                    combined |= operand
+            stack.append(combined)
+        elif operation == "implies":
+            consequent = stack.pop()
+            stack.append(~stack.pop() | consequent)
+        else:
+            right = stack.pop()
+            stack.append(~(stack.pop() ^ right))
+    return stack.pop()
+
+
+def columns(count, start, words):
+    """
+    Returns one uint64 column per symbol for the `words` words of
+    models starting at word `start`.
+    """
+    result = []
+    indices = np.arange(start, start + words, dtype=np.uint64)
+    for i in range(count):
+        if i < 6:
+            result.append(np.full(words, PATTERNS[i], dtype=np.uint64))
+        else:
+            # Constant within a word: all ones where bit i - 6 of the word index is set
+            bits = (indices >> np.uint64(i - 6)) & np.uint64(1)
+            result.append(np.uint64(0) - bits)
+    return result
+
+
+def model_check(knowledge, query, chunk_words=CHUNK_WORDS):
+    """Checks if knowledge base entails query."""
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    slots = {name: i for i, name in enumerate(symbols)}
+    knowledge_program = compile_postfix(knowledge, slots)
+    query_program = compile_postfix(query, slots)
+
+    count = len(symbols)
+    total_words = max(1, (1 << count) // 64)
+    # With fewer than 6 symbols only the low 2^n bits of the word are models
+    valid = ALL if count >= 6 else np.uint64((1 << (1 << count)) - 1)
+
+    for start in range(0, total_words, chunk_words):
+        words = min(chunk_words, total_words - start)
+        chunk = columns(count, start, words)
+        models = run(knowledge_program, chunk, words)
+        countermodels = models & ~run(query_program, chunk, words) & valid
+        if countermodels.any():
+            return False
+    return True
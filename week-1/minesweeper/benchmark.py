@@ -0,0 +1,68 @@
+import argparse
+import random
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+
+def play(height, width, mines, seed):
+    """
+    Plays one game headlessly with the AI. Returns whether it won, the
+    number of moves, how many of them were random guesses and the
+    seconds the AI spent choosing moves and updating its knowledge.
+    """
+    random.seed(seed)
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width)
+    moves = guesses = 0
+    thinking = 0.0
+    safe_cells = height * width - mines
+
+    while len(ai.moves_made) < safe_cells:
+        start = time.perf_counter()
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+            guesses += 1
+        thinking += time.perf_counter() - start
+        if move is None:
+            break
+        moves += 1
+        if game.is_mine(move):
+            return False, moves, guesses, thinking
+
+        start = time.perf_counter()
+        ai.add_knowledge(move, game.nearby_mines(move))
+        thinking += time.perf_counter() - start
+
+    return len(ai.moves_made) == safe_cells, moves, guesses, thinking
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure MinesweeperAI speed and win rate")
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--height", type=int, default=16)
+    parser.add_argument("--width", type=int, default=30)
+    parser.add_argument("--mines", type=int, default=99)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    wins = moves = guesses = 0
+    thinking = 0.0
+    for game in range(args.games):
+        won, game_moves, game_guesses, game_thinking = play(
+            args.height, args.width, args.mines, args.seed + game
+        )
+        wins += won
+        moves += game_moves
+        guesses += game_guesses
+        thinking += game_thinking
+
+    print(f"{args.games} games, {args.height}x{args.width} with {args.mines} mines")
+    print(f"    win rate:     {wins / args.games:.1%}")
+    print(f"    moves/second: {moves / thinking:.0f}")
+    print(f"    random moves: {guesses / moves:.1%} of {moves}")
+
+
+if __name__ == "__main__":
+    main()
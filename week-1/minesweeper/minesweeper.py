@@ -1,6 +1,6 @@
 import itertools
 import random
-import copy
+from collections import deque
 
 class Minesweeper():
     """
@@ -105,33 +105,33 @@ class Sentence():
         """
         Returns the set of all cells in self.cells known to be mines.
         """
-        raise NotImplementedError
+        if self.count > 0 and len(self.cells) == self.count:
+            return set(self.cells)
+        return set()
 
     def known_safes(self):
         """
         Returns the set of all cells in self.cells known to be safe.
         """
-        raise NotImplementedError
+        if self.count == 0:
+            return set(self.cells)
+        return set()
 
     def mark_mine(self, cell):
         """
         Updates internal knowledge representation given the fact that
         a cell is known to be a mine.
         """
-        self.mines.add(cell)
-        
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        if cell in self.cells:
+            self.cells.remove(cell)
+            self.count -= 1
 
     def mark_safe(self, cell):
         """
         Updates internal knowledge representation given the fact that
         a cell is known to be safe.
         """
-        if cell in self.cells:
-            self.cells.remove(cell)
-        else:
-            pass
+        self.cells.discard(cell)
 
 
 class MinesweeperAI():
@@ -152,28 +152,66 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Sentences about the game known to be true, by a stable id
+        self.sentences = {}
+        self.ids = itertools.count()
+
+        # Ids of the sentences mentioning each unknown cell, so that
+        # learning about a cell only touches the sentences it affects
+        self.containing = {}
+
+        # (cells, count) of every sentence, to skip duplicates
+        self.signatures = {}
+        self.signature_of = {}
+
+        # Sentences changed since inference last looked at them
+        self.queue = deque()
+        self.queued = set()
+
+    @property
+    def knowledge(self):
+        """
+        Live read-only view of the sentences about the game known to be
+        true. Assigning a collection of sentences replaces them all.
+        """
+        return self.sentences.values()
+
+    @knowledge.setter
+    def knowledge(self, sentences):
+        sentences = list(sentences)
+        self.sentences.clear()
+        self.containing.clear()
+        self.signatures.clear()
+        self.signature_of.clear()
+        self.queue.clear()
+        self.queued.clear()
+        for sentence in sentences:
+            self.add_sentence(sentence.cells, sentence.count)
+        self.update_knowledge_based_on_new_info()
 
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
         to mark that cell as a mine as well.
         """
-        self.safes.add(cell)
-
-        for sentence in self.knowledge:
-            if cell in sentence.cells:
-                sentence.mark_safe(cell) 
+        if cell in self.mines:
+            return
+        self.mines.add(cell)
+        for index in self.containing.pop(cell, ()):
+            self.sentences[index].mark_mine(cell)
+            self.changed(index)
 
     def mark_safe(self, cell):
         """
         Marks a cell as safe, and updates all knowledge
         to mark that cell as safe as well.
         """
+        if cell in self.safes:
+            return
         self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        for index in self.containing.pop(cell, ()):
+            self.sentences[index].mark_safe(cell)
+            self.changed(index)
 
     def add_knowledge(self, cell, count):
         """
@@ -191,17 +229,8 @@ class MinesweeperAI():
                if they can be inferred from existing knowledge
         """
         self.moves_made.add(cell)
-        self.safes.add(cell)
-
-        neighbors = self.return_close_cells(cell)
-
-        unknown_neighbors = {n for n in neighbors if n not in self.mines and n not in self.safes}
-
-
-        new_count = count - len([n for n in neighbors if n in self.mines])
-        if unknown_neighbors:
-            self.knowledge.append(Sentence(unknown_neighbors, new_count))
-
+        self.mark_safe(cell)
+        self.add_sentence(self.return_close_cells(cell), count)
         self.update_knowledge_based_on_new_info()
 
     def return_close_cells(self, cell):
@@ -211,26 +240,93 @@ class MinesweeperAI():
         x, y = cell
         return {(x + dx, y + dy) for dx in range(-1, 2) for dy in range(-1, 2) if (dx != 0 or dy != 0) and 0 <= x + dx < self.height and 0 <= y + dy < self.width}
 
+    def add_sentence(self, cells, count):
+        """
+        Adds the sentence that `count` of `cells` are mines, leaving out
+        cells already known to be safe or mines.
+        """
+        unknown = set()
+        for cell in cells:
+            if cell in self.mines:
+                count -= 1
+            elif cell not in self.safes:
+                unknown.add(cell)
+        if not unknown:
+            return
+
+        signature = (frozenset(unknown), count)
+        if signature in self.signatures:
+            return
+        index = next(self.ids)
+        sentence = Sentence(unknown, count)
+        self.sentences[index] = sentence
+        self.signatures[signature] = index
+        self.signature_of[index] = signature
+        for cell in unknown:
+            self.containing.setdefault(cell, set()).add(index)
+        self.enqueue(index)
+
+    def remove_sentence(self, index):
+        sentence = self.sentences.pop(index)
+        for cell in sentence.cells:
+            self.containing[cell].discard(index)
+        del self.signatures[self.signature_of.pop(index)]
+
+    def changed(self, index):
+        """
+        Re-registers a sentence whose cells just changed, dropping it if
+        it now duplicates another or says nothing.
+        """
+        sentence = self.sentences[index]
+        signature = (frozenset(sentence.cells), sentence.count)
+        if not sentence.cells or signature in self.signatures:
+            self.remove_sentence(index)
+            return
+        del self.signatures[self.signature_of[index]]
+        self.signatures[signature] = index
+        self.signature_of[index] = signature
+        self.enqueue(index)
+
+    def enqueue(self, index):
+        if index not in self.queued:
+            self.queued.add(index)
+            self.queue.append(index)
 
     def update_knowledge_based_on_new_info(self):
         """
-        Checks and updates the knowledge base based on the new information.
+        Draws conclusions from every changed sentence until nothing
+        more follows: cells a sentence settles are marked, and a
+        sentence whose cells are a subset of another's yields their
+        difference. Only sentences sharing a cell can be subsets of
+        each other, so only those are compared.
         """
-        new_knowledge = []
-        for sentence in self.knowledge:
-            new_cells = sentence.cells - self.safes
-            if new_cells != sentence.cells:
-                sentence.cells = new_cells
-                sentence.count -= len(sentence.cells - new_cells)
-
-            if sentence.count == 0:
-                self.safes.update(sentence.cells)
-            elif len(sentence.cells) == sentence.count:
-                self.mines.update(sentence.cells)
-            else:
-                new_knowledge.append(sentence)
-
-        self.knowledge = new_knowledge
+        while self.queue:
+            index = self.queue.popleft()
+            self.queued.discard(index)
+            if index not in self.sentences:
+                continue
+            sentence = self.sentences[index]
+
+            settled = False
+            for cell in sentence.known_safes():
+                self.mark_safe(cell)
+                settled = True
+            for cell in sentence.known_mines():
+                self.mark_mine(cell)
+                settled = True
+            if settled:
+                continue
+
+            neighbors = set()
+            for cell in sentence.cells:
+                neighbors.update(self.containing[cell])
+            neighbors.discard(index)
+            for other_index in neighbors:
+                other = self.sentences[other_index]
+                if other.cells < sentence.cells:
+                    self.add_sentence(sentence.cells - other.cells, sentence.count - other.count)
+                elif sentence.cells < other.cells:
+                    self.add_sentence(other.cells - sentence.cells, other.count - sentence.count)
 
     def make_safe_move(self):
         """
@@ -253,7 +349,6 @@ class MinesweeperAI():
         1) have not already been chosen, and
         2) are not known to be mines
         """
-        max_moves = self.width * self.height
         occupied_positions = self.moves_made | self.mines
 
         all_positions = {(row, col) for row in range(self.height) for col in range(self.width)}